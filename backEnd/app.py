@@ -4,11 +4,23 @@ from flask_cors import CORS
 
 import firebase_admin
 import player_analyzer
-from prediction_analyzer import calculate_poisson_probability
-from monte_carlo import monte_carlo_for_player
+import player_profile
+from monte_carlo import batch_monte_carlo, player_point_moments
 from chatgpt_bet_explainer import get_bet_explanation_from_chatgpt
-from volatility import fetch_point_series, forecast_volatility, forecast_playoff_volatility
+from volatility import (fetch_point_series, forecast_volatility, forecast_playoff_volatility,
+                        forecast_many, playoff_point_series,
+                        VOLATILITY_ESTIMATOR_INTERACTIVE, VOLATILITY_ESTIMATOR_BATCH)
 import injury_report
+import standings_snapshot
+import team_registry
+import single_flight
+import job_queue
+import parlay_pricing
+import box_score_cache
+import schedule_index
+import volatility
+import distribution_store
+from fetch_planner import ESPN, host_slot
 
 from screenshot_parser import parse_image_data_url
 import base64
@@ -16,8 +28,12 @@ import requests
 
 import os
 import json
+import threading
+import time
+import pytz
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from firebase_admin import credentials, firestore, initialize_app
-from nba_api.stats.endpoints import ScoreboardV2, BoxScoreTraditionalV2
 from requests.exceptions import ReadTimeout
 import logging
 
@@ -45,6 +61,13 @@ if not firebase_admin._apps:
     firebase_admin.initialize_app()
 db = firestore.client()
 
+# Standings are read on every analysis – have a snapshot ready before the first one.
+standings_snapshot.warm_in_background()
+
+# Background analysis jobs; state is shared through JOB_STORE so any worker
+# (or instance, with the Firestore store) can answer a status poll.
+jobs = job_queue.JobQueue(job_queue.make_store(os.getenv("JOB_STORE", "firestore"), db=db))
+
 def pkey(name: str) -> str:
     return name.lower().replace(" ", "_")
 
@@ -59,6 +82,74 @@ def thr_doc_ref(name: str, threshold: float):
         .document(doc_id)
     )
 
+def active_players_ref():
+    return db.collection("processedPlayers").document("players").collection("active")
+
+# ── recently served /api/player documents ────────────────────────────────
+# Small LRU in front of the keyed Firestore query, so repeat hits on a
+# popular prop don't even cost a read. Entries expire after a short TTL;
+# a document concluded by another worker may be served that long.
+ACTIVE_DOC_TTL_SECONDS = int(os.getenv("ACTIVE_DOC_TTL_SECONDS", "60"))
+ACTIVE_DOC_CACHE_SIZE = int(os.getenv("ACTIVE_DOC_CACHE_SIZE", "512"))
+
+_recent_docs = OrderedDict()        # (playerKey, threshold) -> (stored_at, doc)
+_recent_docs_lock = threading.Lock()
+
+
+def _remember_doc(key, threshold, doc):
+    with _recent_docs_lock:
+        _recent_docs[(key, threshold)] = (time.time(), doc)
+        _recent_docs.move_to_end((key, threshold))
+        while len(_recent_docs) > ACTIVE_DOC_CACHE_SIZE:
+            _recent_docs.popitem(last=False)
+
+
+def _forget_doc(key, threshold):
+    with _recent_docs_lock:
+        _recent_docs.pop((key, threshold), None)
+
+
+def find_active_doc(key, threshold):
+    """
+    Active player document for (playerKey, threshold), or None.
+    LRU first, then an equality query on the stored playerKey/threshold
+    fields – constant cost however many props are active. Documents
+    written before playerKey was stored are found by doc-id prefix
+    ("{key}_{threshold}[_{date}]") and get the field backfilled.
+    """
+    with _recent_docs_lock:
+        hit = _recent_docs.get((key, threshold))
+        if hit and time.time() - hit[0] <= ACTIVE_DOC_TTL_SECONDS:
+            _recent_docs.move_to_end((key, threshold))
+            return hit[1]
+
+    query = (
+        active_players_ref()
+        .where("playerKey", "==", key)
+        .where("threshold", "==", threshold)
+        .limit(1)
+    )
+    for snap in query.stream():
+        doc = snap.to_dict()
+        _remember_doc(key, threshold, doc)
+        return doc
+
+    prefix = f"{key}_{threshold}"
+    legacy = (
+        active_players_ref()
+        .where("__name__", ">=", active_players_ref().document(prefix))
+        .where("__name__", "<=", active_players_ref().document(prefix + "_\uf8ff"))
+    )
+    for snap in legacy.stream():
+        if snap.id != prefix and not snap.id.startswith(prefix + "_"):
+            continue            # e.g. 24.55 sorts between 24.5 and 24.5_
+        snap.reference.update({"playerKey": key})
+        doc = {**snap.to_dict(), "playerKey": key}
+        _remember_doc(key, threshold, doc)
+        return doc
+    _forget_doc(key, threshold)
+    return None
+
 from google.cloud.firestore_v1 import transforms
 
 def _strip_sentinels(obj):
@@ -71,16 +162,44 @@ def _strip_sentinels(obj):
         return [_strip_sentinels(v) for v in obj]
     return obj
 
+ESPN_SCOREBOARD_TTL_SECONDS = int(os.getenv("ESPN_SCOREBOARD_TTL_SECONDS", "120"))
+_espn_scoreboard = {"fetched_at": 0.0, "data": None}
+_espn_scoreboard_lock = threading.Lock()
+
 def _fetch_scoreboard() -> dict:
-    """Pull raw JSON for a single YYYYMMDD date."""
-    resp = requests.get("https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard")
-    resp.raise_for_status()
-    return resp.json()
+    """
+    Today's ESPN scoreboard JSON, shared for ESPN_SCOREBOARD_TTL_SECONDS
+    so a batch of props doesn't refetch the same odds per player.
+    """
+    with _espn_scoreboard_lock:
+        if (_espn_scoreboard["data"] is not None
+                and time.time() - _espn_scoreboard["fetched_at"] <= ESPN_SCOREBOARD_TTL_SECONDS):
+            return _espn_scoreboard["data"]
+        with host_slot(ESPN):
+            resp = requests.get("https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard")
+        resp.raise_for_status()
+        _espn_scoreboard.update(fetched_at=time.time(), data=resp.json())
+        return _espn_scoreboard["data"]
 
 
 ######### BEGINNING OF MAIN ROUTES #########
-def fetch_game_status(data):
-    """Check if a game is finished based on game data"""
+def game_statuses_for(game_date):
+    """{GAME_ID: GAME_STATUS_TEXT} from a freshly fetched scoreboard for `game_date`."""
+    entry = schedule_index.scoreboard_for(game_date, max_age=0)
+    df = entry["frame"] if entry else None
+    if df is None or df.empty:
+        logger.info(f"No game data available for date {game_date:%m/%d/%Y}")
+        return {}
+    return dict(zip(df["GAME_ID"], df["GAME_STATUS_TEXT"]))
+
+def fetch_game_status(data, statuses=None):
+    """
+    Check if a game is finished based on game data.
+
+    `statuses` is an optional {date: {GAME_ID: status}} memo shared by a
+    settlement pass, so each date's scoreboard is fetched once no matter
+    how many props are on it.
+    """
     try:
         game_date = data.get("gameDate")
         game_id = data.get("gameId")
@@ -89,58 +208,46 @@ def fetch_game_status(data):
             logger.warning(f"Missing gameDate or gameId in data: {data}")
             return False
             
-        # Convert Firestore timestamp to string if needed
+        # Firestore timestamp or "MM/DD/YYYY" string
         if hasattr(game_date, 'strftime'):
-            game_date = game_date.strftime('%m/%d/%Y')
+            game_date = datetime.date(game_date.year, game_date.month, game_date.day)
         elif isinstance(game_date, str):
-            # Already a string, use as-is
-            pass
+            game_date = datetime.datetime.strptime(game_date, "%m/%d/%Y").date()
         else:
             logger.warning(f"Unexpected gameDate format: {game_date}")
             return False
-            
-        sb = ScoreboardV2(game_date=game_date, league_id="00", timeout=30)
-        df = sb.game_header.get_data_frame()
-        
-        if df is None or df.empty:
-            logger.info(f"No game data available for date {game_date}")
-            return False
-            
-        if game_id in df['GAME_ID'].values:
-            mask = df["GAME_ID"] == game_id
-            game_status = df.loc[mask, "GAME_STATUS_TEXT"].iloc[0]
-            logger.info(f"Game {game_id} status: {game_status}")
-            return game_status == "Final"
-        else:
+
+        statuses = {} if statuses is None else statuses
+        if game_date not in statuses:
+            statuses[game_date] = game_statuses_for(game_date)
+
+        game_status = statuses[game_date].get(game_id)
+        if game_status is None:
             logger.info(f"Game {game_id} not found in scoreboard")
             return False
+        logger.info(f"Game {game_id} status: {game_status}")
+        return game_status == "Final"
             
-    except ReadTimeout:
-        logger.warning(f"NBA API timeout for game {data.get('gameId', 'unknown')}")
-        return False
     except Exception as e:
         logger.error(f"Error fetching game status: {e}")
         return False
 
 def fetch_player_stats(game_id, player_id):
-    """Return (points, minutes) or (None, None)."""
+    """Return (points, minutes) or (None, None). Box scores come from box_score_cache."""
     try:
-        bb = BoxScoreTraditionalV2(game_id=game_id, timeout=30)
-        df = bb.player_stats.get_data_frame()
+        box = box_score_cache.get_box_score(game_id)
         
-        if df.empty:
+        if not box:
             logger.warning(f"No player stats available for game {game_id}")
             return None, None
             
-        mask = df["PLAYER_ID"] == int(player_id)
-        if not mask.any():
+        row = box.get(int(player_id))
+        if row is None:
             logger.warning(f"Player {player_id} not found in game {game_id}")
             return None, None
-            
-        row = df.loc[mask].iloc[0]
         
         # Check if the player did not play
-        if "DNP" in row["COMMENT"]:
+        if "DNP" in (row["COMMENT"] or ""):
             logger.info(f"Player {player_id} did not play in game {game_id}")
             return -1, -1
                 
@@ -197,6 +304,15 @@ def update_doc(ref, data):
         logger.error(f"Error updating document: {e}")
         return False
 
+def record_final_points(data):
+    """Fold a settled game into the player's distribution (see distribution_store)."""
+    try:
+        distribution_store.record(
+            data["playerId"], data["gameId"], data.get("finalPoints"), data["gameDate"]
+        )
+    except Exception as e:
+        logger.warning(f"Could not record final points for {data.get('playerId')}: {e}")
+
 def resolve_document_reference(doc_ref):
     """Resolve a document reference to its data"""
     try:
@@ -237,6 +353,7 @@ def move_player_to_concluded(player_id, player_data):
               .document(player_id)
         )
         active_ref.delete()
+        _forget_doc(player_data.get("playerKey"), player_data.get("threshold"))
         logger.info(f"Deleted active document for player {player_id}")
         
         return concluded_ref
@@ -252,6 +369,7 @@ def check_active_players():
         
         processed_count = 0
         moved_count = 0
+        statuses = {}   # one scoreboard per game date for the whole pass
         
         for snap in coll.stream():
             processed_count += 1
@@ -266,13 +384,14 @@ def check_active_players():
             logger.info(f"Checking player {player_id}")
             
             # Check if game is finished
-            if fetch_game_status(player_data):
+            if fetch_game_status(player_data, statuses):
                 logger.info(f"Game finished for player {player_id}, updating...")
                 
                 # Update with final stats
                 if update_doc(snap.reference, player_data):
                     # Get updated data
                     updated_data = snap.reference.get().to_dict()
+                    record_final_points(updated_data)
                     
                     # Move to concluded collection
                     if move_player_to_concluded(player_id, updated_data):
@@ -481,6 +600,108 @@ def check_active_bets():
     except Exception as e:
         logger.error(f"Error checking active bets: {e}")
 
+FIRESTORE_BATCH_LIMIT = 500
+
+def reprice_active_props(method="exact", seed=None):
+    """
+    Refresh monteCarloProbability on every scheduled active prop.
+
+    (μ, σ) is re-derived once per player from the (cached) game logs –
+    falling back to the stored mcMu/mcSigma – and every prop is priced
+    in one batch_monte_carlo call. Writes go out in Firestore batches.
+    Returns the number of documents updated.
+    """
+    moments, rows = {}, []
+    for snap in active_players_ref().stream():
+        data = snap.to_dict()
+        name, threshold = data.get("name"), data.get("threshold")
+        if not name or threshold is None or data.get("gameStatus") == "Concluded":
+            continue
+        if name not in moments:
+            stored = (data.get("mcMu"), data.get("mcSigma"))
+            moments[name] = player_point_moments(name) or (stored if None not in stored else None)
+        if moments[name] is None:
+            continue
+        rows.append((snap.reference, moments[name], float(threshold)))
+
+    if not rows:
+        return 0
+    priced = batch_monte_carlo(
+        [mu for _, (mu, _), _ in rows],
+        [sigma for _, (_, sigma), _ in rows],
+        [threshold for _, _, threshold in rows],
+        method=method,
+        seed=seed,
+    )
+
+    commit_updates(
+        (ref, {"monteCarloProbability": float(prob), "mcMu": mu, "mcSigma": sigma})
+        for (ref, (mu, sigma), _), prob in zip(rows, priced["prob_over"])
+    )
+    logger.info(f"Repriced {len(rows)} active props ({method})")
+    return len(rows)
+
+def refresh_active_volatility(max_workers=None, estimator=VOLATILITY_ESTIMATOR_BATCH):
+    """
+    Refit volatilityForecast / volatilityPlayOffsForecast for every player
+    with a scheduled active prop.
+
+    Series come from the stored documents plus the (cached) game logs, one
+    per player; GARCH fits run across a process pool, the closed-form
+    estimators in one vectorized pass, and every doc of that player is
+    updated in Firestore batches. Returns the number of
+    documents updated.
+    """
+    docs, series = {}, {}
+    for snap in active_players_ref().stream():
+        data = snap.to_dict()
+        player_id = data.get("playerId")
+        if not player_id or data.get("gameStatus") == "Concluded":
+            continue
+        docs.setdefault(player_id, []).append(snap.reference)
+        if ("regular", player_id) in series:
+            continue
+        try:
+            series[("regular", player_id)] = fetch_point_series(data, n_games=50)
+        except Exception as e:
+            logger.warning(f"No point series for {player_id}: {e}")
+            continue
+        if (data.get("num_playoff_games") or 0) >= 5:
+            series[("playoffs", player_id)] = playoff_point_series(data)
+
+    kwargs = {"max_workers": max_workers} if max_workers else {}
+    sigmas = forecast_many(series, estimator=estimator, **kwargs)
+
+    def updates():
+        for player_id, refs in docs.items():
+            if ("regular", player_id) not in sigmas:
+                continue
+            fields = {
+                "volatilityForecast": sigmas[("regular", player_id)],
+                "volatilityPlayOffsForecast": sigmas.get(("playoffs", player_id)),
+                "volatilityEstimator": estimator,
+            }
+            for ref in refs:
+                yield ref, fields
+
+    updated = commit_updates(updates())
+    logger.info(f"Refreshed volatility for {len(docs)} players ({updated} docs)")
+    return updated
+
+def commit_updates(updates):
+    """Apply (ref, fields) updates in Firestore batches; returns how many were written."""
+    batch, pending, total = db.batch(), 0, 0
+    for ref, fields in updates:
+        batch.update(ref, fields)
+        pending += 1
+        total += 1
+        if pending == FIRESTORE_BATCH_LIMIT:
+            batch.commit()
+            batch, pending = db.batch(), 0
+    if pending:
+        batch.commit()
+    return total
+
 def check_games_handler(request):
     """Main handler for checking and updating game statuses"""
     try:
@@ -515,41 +736,15 @@ def check_games_handler(request):
 
 
 ######### BETTING OF API ENDPOINTS #########
-@app.route("/api/player", methods=["POST"])
-def analyze_player_endpoint():
-    body      = request.json or {}
-    name      = body.get("playerName")
-    threshold = float(body.get("threshold"))
-    key       = name.lower().replace(" ", "_")
-    coll_ref = (
-        db.collection("processedPlayers")
-          .document("players")
-          .collection("active")
-    )
-    
-    doc_ref = None
-    for doc in coll_ref.stream():
-        if doc.id.startswith(f"{key}_{threshold}"):
-            doc_ref = doc.reference
-            break
-
-    # 2) If found, return it
-    if doc_ref:
-        snap = doc_ref.get()
-        if snap.exists:
-            return jsonify(snap.to_dict()), 200
-
-
-    # 3) If not found, continue with analysis
-
-    # 1) run your pipeline
+def _build_profile(name):
+    """
+    Everything in a player document that does not depend on the line:
+    analyzer output, injury report, volatility forecasts and ESPN odds.
+    """
     first, last = name.split(maxsplit=1)
-    pdata = player_analyzer.analyze_player(first, last, threshold)
+    pdata = player_analyzer.profile_player(first, last)
     if "error" in pdata:
-        return jsonify({"error": pdata["error"]}), 400
-
-
-
+        return pdata
 
     ###### ------------------------------------------------- ######
     ### Final Variables Being Inputted into the Player Document ###
@@ -570,21 +765,19 @@ def analyze_player_endpoint():
         )
     )
 
-    season_avg = pdata.get("seasonAvgPoints")
-    pdata["poissonProbability"] = (
-        calculate_poisson_probability(season_avg, threshold)
-        if season_avg is not None
-        else None
-    )
-    pdata["monteCarloProbability"] = monte_carlo_for_player(name, threshold) or -1
+    # (μ, σ) for the Monte Carlo; apply_threshold() runs it per line
+    moments = player_point_moments(name)
+    pdata["mcMu"], pdata["mcSigma"] = moments if moments else (None, None)
 
-    # — GARCH vol forecast —
+    # — vol forecast (fast estimator here; /refresh_volatility refits with GARCH) —
+    estimator = VOLATILITY_ESTIMATOR_INTERACTIVE
     series = fetch_point_series(pdata, n_games=50)
-    vol   = forecast_volatility(series)
+    vol   = forecast_volatility(series, ("regular", pdata.get("playerId")), estimator)
     pdata["volatilityForecast"] = vol
+    pdata["volatilityEstimator"] = estimator
 
-    if pdata["num_playoff_games"] >= 5:
-        pdata["volatilityPlayOffsForecast"] = forecast_playoff_volatility(pdata)
+    if (pdata.get("num_playoff_games") or 0) >= 5:
+        pdata["volatilityPlayOffsForecast"] = forecast_playoff_volatility(pdata, estimator)
     else:
         pdata["volatilityPlayOffsForecast"] = None
 
@@ -630,7 +823,7 @@ def analyze_player_endpoint():
     try:
         comp = next(
             e["competitions"][0] for e in events
-            if any(t["team"]["displayName"] == pdata["team"]
+            if any(team_registry.same_team(t["team"]["displayName"], pdata["team"])
                 for t in e["competitions"][0]["competitors"])
         )
     except StopIteration:
@@ -683,27 +876,149 @@ def analyze_player_endpoint():
     #pdata['awayTeamOdds'] = odds.get('awayTeamOdds')
     #pdata['homeTeamOdds'] = odds.get('homeTeamOdds')
 
+    return pdata
+
+
+def _analyze_prop(name, threshold):
+    """
+    Analyze one prop and store it in the active collection.
+    Returns the player document, or {"error": ...} if the player can't be
+    resolved.
+    """
+    key = pkey(name)
 
+    # Derive this line from the player's cached profile
+    profile = player_profile.get_profile(key, lambda: _build_profile(name))
+    if isinstance(profile, dict):
+        return {"error": profile["error"]}
+    pdata = player_profile.apply_threshold(profile, threshold)
 
     game_date_obj = datetime.datetime.strptime(pdata["gameDate"], "%m/%d/%Y")
     # …and re-format to YYYYMMDD
     doc_date = game_date_obj.strftime("%Y%m%d")
-    pdata["pick_id"]      = f"{pkey(name)}_{threshold}_{doc_date}"
+    pdata["pick_id"]      = f"{key}_{threshold}_{doc_date}"
+    pdata["playerKey"]    = key
 
     pdata["betExplanation"]      = get_bet_explanation_from_chatgpt(pdata)
 
+    # persist it (writes to processedPlayers/players/active/{player_threshold_date})
+    ref = active_players_ref().document(f"{key}_{threshold}_{doc_date}")
+    ref.set(pdata)
+    _remember_doc(key, threshold, pdata)
+    return pdata
 
 
+def _eastern_today():
+    return datetime.datetime.now(pytz.timezone("America/New_York")).date()
 
 
+BATCH_ANALYSIS_WORKERS = int(os.getenv("BATCH_ANALYSIS_WORKERS", "4"))
+# Larger batches go to the job queue: several waves of cold analyses would
+# run into gunicorn's --timeout and lose every result with the worker.
+SYNC_BATCH_LIMIT = int(os.getenv("SYNC_BATCH_LIMIT", str(BATCH_ANALYSIS_WORKERS)))
 
 
-    # 2) persist it (writes to processedPlayers/players/active/{player_threshold_date})
-    ref = db.collection("processedPlayers") \
-            .document("players") \
-            .collection("active") \
-            .document(f"{key}_{threshold}_{doc_date}")
-    ref.set(pdata)
+def analyze_prop(name, threshold):
+    """
+    Cached document or fresh analysis for one prop, coalesced with any
+    concurrent request for the same prop. Returns (status, document),
+    status being "cached", "analyzed" or "error".
+    """
+    key = pkey(name)
+    cached = find_active_doc(key, threshold)
+    if cached is not None:
+        return "cached", cached
+    pdata = single_flight.do(
+        (key, threshold, _eastern_today().isoformat()),
+        lambda: _analyze_prop(name, threshold),
+        recheck=lambda: find_active_doc(key, threshold),
+    )
+    return ("error" if "error" in pdata else "analyzed"), pdata
+
+
+def analyze_props(entries, max_workers=BATCH_ANALYSIS_WORKERS, on_result=None):
+    """
+    Analyze a list of {"playerName", "threshold", ...} entries in-process.
+
+    Duplicate (player, threshold) pairs are analyzed once; players are
+    analyzed concurrently (at most `max_workers` at a time) and share the
+    profile, schedule, standings and odds caches. Returns one
+    {"playerName", "threshold", "status", ...} per input entry, in order.
+    `on_result(done, total, row)` is called as each unique prop finishes
+    (invalid entries are reported first).
+    """
+    results, unique = [], {}
+    for entry in entries:
+        entry = entry if isinstance(entry, dict) else {}
+        name = entry.get("playerName")
+        try:
+            threshold = float(entry.get("threshold"))
+        except (TypeError, ValueError):
+            threshold = None
+        row = {**entry, "playerName": name, "threshold": threshold}
+        if not name or threshold is None:
+            row.update(status="error", error="playerName and numeric threshold are required")
+        else:
+            unique.setdefault((pkey(name), threshold), (name, threshold))
+        results.append(row)
+
+    def run(name_threshold):
+        name, threshold = name_threshold
+        try:
+            return analyze_prop(name, threshold)
+        except Exception as e:
+            logger.exception(f"Batch analysis failed for {name} @ {threshold}")
+            return "error", {"error": str(e)}
+
+    def outcome_row(name_threshold, outcome):
+        status, doc = outcome
+        row = {"playerName": name_threshold[0], "threshold": name_threshold[1], "status": status}
+        if status == "error":
+            row["error"] = doc.get("error")
+        else:
+            row["pick_id"] = doc.get("pick_id")
+        return row
+
+    invalid = [row for row in results if "status" in row]
+    total = len(unique) + len(invalid)
+    if on_result is not None:
+        for i, row in enumerate(invalid, 1):
+            on_result(i, total, row)
+
+    outcomes = {}
+    if unique:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique)))) as pool:
+            futures = {pool.submit(run, nt): key for key, nt in unique.items()}
+            for future in as_completed(futures):
+                key = futures[future]
+                outcomes[key] = outcome_row(unique[key], future.result())
+                if on_result is not None:
+                    on_result(len(invalid) + len(outcomes), total, outcomes[key])
+
+    for row in results:
+        if "status" in row:
+            continue
+        outcome = outcomes[(pkey(row["playerName"]), row["threshold"])]
+        row.update({k: v for k, v in outcome.items() if k not in ("playerName", "threshold")})
+    return results
+
+
+def _run_players_job(payload, report):
+    """job_queue runner for a list of {playerName, threshold} entries."""
+    analyze_props(payload, on_result=report)
+
+
+@app.route("/api/player", methods=["POST"])
+def analyze_player_endpoint():
+    body      = request.json or {}
+    name      = body.get("playerName")
+    threshold = float(body.get("threshold"))
+
+    # 1) Cached document, or an analysis shared with any concurrent
+    #    request for the same prop
+    status, pdata = analyze_prop(name, threshold)
+    if status == "error":
+        return jsonify({"error": pdata["error"]}), 400
 
     # 3) return it
     return jsonify(pdata), 200
@@ -714,15 +1029,16 @@ def parse_screenshot_endpoint():
     """
     1) Accepts multipart/form-data images under 'images'
     2) For each: encode → parse_image_data_url → get list of {player,threshold}
-    3) For each pair: POST to /api/player so it goes through your normal pipeline.
-    4) Return the flat list of all parsed entries.
+    3) Analyze all pairs in-process as one batch (see analyze_props).
+    4) Return the flat list of all parsed entries with a per-entry status –
+       or, past SYNC_BATCH_LIMIT entries, the parsed entries plus a job id
+       (202) to poll at /api/jobs/<job_id>.
     """
     files = request.files.getlist("images")
     if not files:
         return jsonify({"error": "No images uploaded"}), 400
 
-    parsed = []
-    base = request.url_root.rstrip("/").replace("http://", "https://", 1)
+    entries = []
 
     for img in files:
         raw = img.read()
@@ -735,7 +1051,6 @@ def parse_screenshot_endpoint():
             players = result.get("players", [])
         except Exception:
             app.logger.exception("Screenshot parsing failed")
-            parsed = {"players": [], "count": 0}
             continue
 
         for entry in players:
@@ -744,24 +1059,104 @@ def parse_screenshot_endpoint():
             image = entry.get("image")
             if not name or threshold is None:
                 continue
+            entries.append({"playerName": name, "threshold": threshold, "image": image})
 
-            # Fire off your existing analyze route:
-            try:
-                requests.post(
-                    f"{base}/api/player",
-                    json={"playerName": name, "threshold": threshold, "image": image},
-                    timeout=10
-                )
-            except Exception:
-                # swallow any network or timeout errors
-                pass
+    if len(entries) > SYNC_BATCH_LIMIT:
+        job_id = jobs.submit("players", entries, _run_players_job)
+        return jsonify({
+            "status": "queued",
+            "jobId": job_id,
+            "statusUrl": f"/api/jobs/{job_id}",
+            "parsedPlayers": entries,
+        }), 202
 
-            parsed.append({"playerName": name, "threshold": threshold, "image": image})
-            print(f"[→ POST]/api/player  {name}  @ {threshold}")
+    parsed = analyze_props(entries)
+    for row in parsed:
+        print(f"[batch] {row['playerName']}  @ {row['threshold']}  → {row['status']}")
 
     return jsonify({"status": "ok", "parsedPlayers": parsed}), 200
 
 
+@app.route("/api/players/batch", methods=["POST"])
+def analyze_players_batch_endpoint():
+    """
+    Body: {"players": [{"playerName": str, "threshold": float}, ...]}
+    Returns {"results": [...]} with one status per entry (see analyze_props);
+    past SYNC_BATCH_LIMIT entries, a job id to poll instead (202).
+    """
+    body = request.json or {}
+    entries = body.get("players")
+    if not isinstance(entries, list) or not entries:
+        return jsonify({"error": "players must be a non-empty list"}), 400
+    if len(entries) > SYNC_BATCH_LIMIT:
+        job_id = jobs.submit("players", entries, _run_players_job)
+        return jsonify({"jobId": job_id, "statusUrl": f"/api/jobs/{job_id}"}), 202
+    return jsonify({"results": analyze_props(entries)}), 200
+
+
+@app.route("/api/jobs/players", methods=["POST"])
+def submit_players_job_endpoint():
+    """
+    Queue an analysis and return immediately.
+    Body: {"playerName", "threshold"} or {"players": [{...}, ...]}
+    Poll GET /api/jobs/<job_id> for progress and per-prop results.
+    """
+    body = request.json or {}
+    entries = body.get("players")
+    if entries is None and body.get("playerName"):
+        entries = [{"playerName": body.get("playerName"), "threshold": body.get("threshold")}]
+    if not isinstance(entries, list) or not entries:
+        return jsonify({"error": "playerName/threshold or a non-empty players list is required"}), 400
+
+    job_id = jobs.submit("players", entries, _run_players_job)
+    return jsonify({"jobId": job_id, "statusUrl": f"/api/jobs/{job_id}"}), 202
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def job_status_endpoint(job_id):
+    job = jobs.status(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job), 200
+
+
+@app.route("/api/parlay/price", methods=["POST"])
+def price_parlays_endpoint():
+    """
+    Body: {"slips": [[pick_id, ...], ...]} – pick ids of active player docs.
+    Returns {"slips": [...]} ranked by the joint probability that every
+    pick goes over, with the independent-product price alongside.
+    """
+    body = request.json or {}
+    slips = body.get("slips")
+    if not isinstance(slips, list) or not slips or not all(isinstance(s, list) and s for s in slips):
+        return jsonify({"error": "slips must be a non-empty list of non-empty pick id lists"}), 400
+
+    pick_ids = list(dict.fromkeys(pid for slip in slips for pid in slip))
+    legs, missing = [], []
+    for pid in pick_ids:
+        snap = active_players_ref().document(pid).get()
+        data = snap.to_dict() if snap.exists else None
+        if data and data.get("mcMu") is None and data.get("name"):
+            data["mcMu"], data["mcSigma"] = player_point_moments(data["name"]) or (None, None)
+        if not data or data.get("mcMu") is None or data.get("threshold") is None:
+            missing.append(pid)
+            continue
+        legs.append(data)
+    if missing:
+        return jsonify({"error": "Unknown or unpriced picks", "picks": missing}), 404
+
+    index = {pid: i for i, pid in enumerate(pick_ids)}
+    ranked = parlay_pricing.rank_slips(
+        legs,
+        [[index[pid] for pid in slip] for slip in slips],
+        player_analyzer.get_current_season(),
+    )
+    for row in ranked:
+        row["picks"] = [pick_ids[i] for i in row.pop("legs")]
+    return jsonify({"slips": ranked}), 200
+
+
 @app.route("/api/player/<player_id>/more_games", methods=["GET"])
 def more_games_endpoint(player_id):
     """
@@ -795,6 +1190,34 @@ def check_games():
             "message": str(e)
         }), 500
 
+@app.route("/reprice_active", methods=["POST", "GET"])
+def reprice_active():
+    """Nightly job: reprice every active prop (?method=exact|simulate, ?seed=N)."""
+    method = request.args.get("method", "exact")
+    if method not in ("exact", "simulate"):
+        return jsonify({"status": "error", "message": f"Unknown method {method}"}), 400
+    seed = request.args.get("seed", type=int)
+    try:
+        updated = reprice_active_props(method=method, seed=seed)
+        return jsonify({"status": "success", "updated": updated}), 200
+    except Exception as e:
+        logger.error(f"Reprice failed: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route("/refresh_volatility", methods=["POST", "GET"])
+def refresh_volatility():
+    """Pre-tip-off job: refit volatility for the whole active slate (?workers=N, ?estimator=)."""
+    estimator = request.args.get("estimator", VOLATILITY_ESTIMATOR_BATCH)
+    if estimator not in volatility.ESTIMATORS:
+        return jsonify({"status": "error", "message": f"Unknown estimator {estimator}"}), 400
+    try:
+        updated = refresh_active_volatility(max_workers=request.args.get("workers", type=int),
+                                            estimator=estimator)
+        return jsonify({"status": "success", "updated": updated}), 200
+    except Exception as e:
+        logger.error(f"Volatility refresh failed: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
 @app.route("/health", methods=["GET"])
 def health_check():
     return jsonify({"status": "healthy", "time": datetime.datetime.utcnow().isoformat()}), 200
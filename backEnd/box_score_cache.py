@@ -0,0 +1,129 @@
+"""
+box_score_cache.py
+──────────────────
+Permanent per-game cache of `BoxScoreTraditionalV2` player stats for
+settlement.
+
+• One fetch per finished game, indexed as {PLAYER_ID: row}, so every prop
+  in that game settles from the same download.
+• A finished game's box score does not change, so entries never expire.
+  Tier 1 is a per-process dict; tier 2 is a SQLite file
+  (`BOX_SCORE_CACHE_DB`) shared by every gunicorn worker and kept across
+  restarts.
+• Only ask for games that are Final – whatever is fetched is kept.
+  Empty box scores and upstream errors are never cached.
+
+Rows handed out are shared between callers – treat them as read-only.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+from nba_api.stats.endpoints import BoxScoreTraditionalV2
+
+from fetch_planner import NBA_STATS, host_slot
+
+BOX_SCORE_CACHE_DB = os.getenv(
+    "BOX_SCORE_CACHE_DB",
+    os.path.join(tempfile.gettempdir(), "lambdarim_box_scores.sqlite3"),
+)
+
+_memory = {}                # game_id -> {player_id: row}
+_memory_lock = threading.Lock()
+_game_locks = {}
+
+
+############################################################################
+### SQLite tier
+############################################################################
+
+def _connect():
+    conn = sqlite3.connect(BOX_SCORE_CACHE_DB, timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS box_scores (game_id TEXT PRIMARY KEY, payload TEXT)"
+    )
+    return conn
+
+
+def _disk_get(game_id):
+    try:
+        with _connect() as conn:
+            row = conn.execute(
+                "SELECT payload FROM box_scores WHERE game_id=?", (game_id,)
+            ).fetchone()
+    except sqlite3.Error as e:
+        print(f"[box_score_cache] disk read failed for {game_id}: {e}")
+        return None
+    if row is None:
+        return None
+    return {int(pid): r for pid, r in json.loads(row[0]).items()}
+
+
+def _disk_put(game_id, by_player):
+    try:
+        with _connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO box_scores VALUES (?, ?)",
+                (game_id, json.dumps(by_player)),
+            )
+    except sqlite3.Error as e:
+        print(f"[box_score_cache] disk write failed for {game_id}: {e}")
+
+
+############################################################################
+### Public API
+############################################################################
+
+def _lock_for(game_id):
+    with _memory_lock:
+        return _game_locks.setdefault(game_id, threading.Lock())
+
+
+def _index(df):
+    # to_json turns NaN into null, like the None nba_api uses for missing stats
+    rows = json.loads(df.to_json(orient="records"))
+    return {int(r["PLAYER_ID"]): r for r in rows}
+
+
+def get_box_score(game_id):
+    """
+    {PLAYER_ID: player_stats row} for a finished game, fetched at most
+    once. Returns {} if the box score has no players yet; upstream errors
+    propagate. Neither is cached.
+    """
+    game_id = str(game_id)
+    with _memory_lock:
+        hit = _memory.get(game_id)
+    if hit is not None:
+        return hit
+
+    with _lock_for(game_id):
+        with _memory_lock:
+            hit = _memory.get(game_id)
+        if hit is not None:
+            return hit
+
+        hit = _disk_get(game_id)
+        if hit is None:
+            with host_slot(NBA_STATS):
+                df = BoxScoreTraditionalV2(game_id=game_id, timeout=30).player_stats.get_data_frame()
+            if df is None or df.empty:
+                return {}
+            hit = _index(df)
+            _disk_put(game_id, hit)
+
+        with _memory_lock:
+            _memory[game_id] = hit
+        return hit
+
+
+def is_cached(game_id):
+    """True if the game's box score is available without a network call."""
+    game_id = str(game_id)
+    with _memory_lock:
+        if game_id in _memory:
+            return True
+    return _disk_get(game_id) is not None
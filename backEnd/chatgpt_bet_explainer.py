@@ -16,11 +16,11 @@ Builds the natural-language write-up for an NBA prop.
 from __future__ import annotations
 import json, math, os, random, typing as _t
 
-import numpy as np
-from scipy import stats as st
 from openai import OpenAI
 from firebase_admin import functions
 
+from distributions import empirical_over, poisson_over
+
 
 # ──────────────────────────────────────────────────
 #  Static context (blurb appears in the prompt)
@@ -63,16 +63,14 @@ _ESPN_CTX = {
 #  Probability helpers (local – no network)
 # ──────────────────────────────────────────────────
 def _poisson_over(lmbda: float, threshold: float) -> float:
-    k = math.floor(threshold)
-    cdf = sum(math.exp(-lmbda) * lmbda**i / math.factorial(i) for i in range(k + 1))
-    return 1 - cdf
+    return poisson_over(lmbda, threshold)
 
 
-def _mc_over(history: list[float], threshold: float, sims: int = 20_000) -> float:
+def _mc_over(history: list[float], threshold: float) -> float:
+    # A bootstrap of `history` converges to the empirical tail – use it directly.
     if not history:
         return None
-    draws = np.random.choice(history, size=sims, replace=True)
-    return float(np.mean(draws > threshold))
+    return empirical_over(history, threshold)
 
 
 def _blend(p_pois: float | None, p_mc: float | None, w_mc: float = 0.6) -> float:
@@ -83,7 +81,10 @@ def _blend(p_pois: float | None, p_mc: float | None, w_mc: float = 0.6) -> float
     return w_mc * p_mc + (1 - w_mc) * p_pois
 
 
-def _ci(p: float, n: int = 20_000) -> tuple[float, float]:
+def _ci(p: float, n: int) -> tuple[float, float]:
+    # n = games behind the estimate; with none, report the point value
+    if not n:
+        return p, p
     se = math.sqrt(p * (1 - p) / n)
     return max(0, p - 1.96 * se), min(1, p + 1.96 * se)
 
@@ -118,12 +119,14 @@ def get_bet_explanation_from_chatgpt(pdata: dict) -> dict[str, str]:
     if poisson is None and pdata.get("seasonAvgPoints") and thr is not None:
         poisson = _poisson_over(pdata["seasonAvgPoints"], thr)
 
+    n_games = pdata.get("num_season_games") or 0
     if mc is None and pdata.get("last5RegularGames"):
         pts_hist = [g["points"] for g in pdata["last5RegularGames"] if "points" in g]
         mc = _mc_over(pts_hist, thr)
+        n_games = n_games or len(pts_hist)
 
     blended = _blend(poisson, mc)
-    lo, hi  = _ci(blended)
+    lo, hi  = _ci(blended, n_games)
     conf_str = f"{lo:.1%} – {hi:.1%}"
 
     # 2) Build a tight, structured prompt
@@ -0,0 +1,196 @@
+"""
+distribution_store.py
+─────────────────────
+Per-player empirical point distributions, kept ready to query.
+
+• Keyed by (player_id, season, season_type). Each entry holds the
+  player's points as a sorted array, the Game_IDs behind them and
+  running (Welford) mean / variance.
+• Built from the shared game-log cache plus the games settlement has
+  recorded there (game_log_cache.record_settled_game). `record()` stores
+  a concluded game's points that way and folds it into this process's
+  entry if one is loaded – an insert into the sorted array and an O(1)
+  moment update, deduplicated by game id. Loaded entries pick up games
+  settled by other workers on their next `get()`.
+• `prob_over` / `under_count` are binary searches and `percentile` /
+  `band` index lookups on the sorted array: no upstream fetch, no
+  resampling. player_profile.apply_threshold takes a line's
+  under-counts and the season's points band from here, so both include
+  games settled since the profile was built.
+• The current season's entries are rebuilt once the Eastern date rolls
+  over; a past season never expires once it was built after the season
+  was over.
+
+Settled games are shared between workers only when GAME_LOG_CACHE_DB is
+set; without the SQLite tier they stay in the process that settled them
+(until the next day's log refetch includes them anyway).
+
+A season is at most ~100 games, so the exact sorted array is smaller
+than any quantile sketch would be and answers every query exactly.
+Entries are shared between callers – treat them as read-only.
+"""
+
+import bisect
+import datetime
+import math
+import threading
+
+import pytz
+
+import distributions
+from game_log_cache import (get_player_game_log, record_settled_game, season_is_final,
+                            settled_games)
+from player_analyzer import deduce_game_type, get_current_season
+
+_EASTERN = pytz.timezone("America/New_York")
+TRACKED_SEASON_TYPES = ("Regular Season", "Playoffs")
+
+_entries = {}               # key -> PlayerDistribution
+_lock = threading.Lock()
+_key_locks = {}
+
+
+def _today_eastern():
+    return datetime.datetime.now(_EASTERN).date()
+
+
+def season_of(game_date):
+    """'2024-25' for a date (or 'MM/DD/YYYY' string) in that season."""
+    if isinstance(game_date, str):
+        game_date = datetime.datetime.strptime(game_date, "%m/%d/%Y").date()
+    start = game_date.year if game_date.month >= 10 else game_date.year - 1
+    return f"{start}-{str(start + 1)[-2:]}"
+
+
+class PlayerDistribution:
+    """Sorted points plus running moments for one player-season."""
+
+    def __init__(self, as_of):
+        self.as_of = as_of
+        self.points = []            # sorted
+        self.game_ids = set()
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, game_id, points):
+        """Fold in one game; False if that game is already counted."""
+        game_id = str(game_id)
+        with self._lock:
+            if game_id in self.game_ids:
+                return False
+            self.game_ids.add(game_id)
+            bisect.insort(self.points, float(points))
+            self.count += 1
+            delta = points - self.mean
+            self.mean += delta / self.count
+            self._m2 += delta * (points - self.mean)
+            return True
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1); None below two games."""
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else None
+
+    def moments(self):
+        return {"games": self.count, "mean": self.mean, "std": self.std}
+
+    def prob_over(self, thresholds):
+        """Share of games strictly above each threshold."""
+        return distributions.empirical_over(self.points, thresholds, presorted=True)
+
+    def under_count(self, threshold):
+        """Games at or below `threshold` (the prop's "under"); None without games."""
+        if not self.count:
+            return None
+        return self.count - int(round(float(self.prob_over(threshold)) * self.count))
+
+    def percentile(self, q):
+        """Points at quantile q (0–1, linear interpolation); None without games."""
+        if not self.count:
+            return None
+        pos = q * (self.count - 1)
+        lo = int(math.floor(pos))
+        hi = min(lo + 1, self.count - 1)
+        return self.points[lo] + (self.points[hi] - self.points[lo]) * (pos - lo)
+
+    def band(self, level=0.8):
+        """Central `level` interval of the player's games, as (low, high)."""
+        tail = (1.0 - level) / 2
+        return self.percentile(tail), self.percentile(1.0 - tail)
+
+
+def _is_fresh(season, entry):
+    if season != get_current_season():
+        return season_is_final(season, entry.as_of)
+    return entry.as_of == _today_eastern()
+
+
+def _merge_settled(key, entry):
+    for game_id, pts in settled_games(*key).items():
+        entry.add(game_id, pts)
+
+
+def _build(key):
+    player_id, season, season_type = key
+    entry = PlayerDistribution(_today_eastern())
+    df = get_player_game_log(player_id, season, season_type)
+    if not df.empty:
+        for game_id, pts in zip(df["Game_ID"], df["PTS"]):
+            if pts is not None and not (isinstance(pts, float) and math.isnan(pts)):
+                entry.add(game_id, pts)
+    _merge_settled(key, entry)
+    return entry
+
+
+def get(player_id, season=None, season_type="Regular Season"):
+    """PlayerDistribution for a player-season, built from the game log on a miss."""
+    key = (int(player_id), season or get_current_season(), season_type)
+    with _lock:
+        hit = _entries.get(key)
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    if hit and _is_fresh(key[1], hit):
+        _merge_settled(key, hit)
+        return hit
+
+    with key_lock:
+        with _lock:
+            hit = _entries.get(key)
+        if hit and _is_fresh(key[1], hit):
+            _merge_settled(key, hit)
+            return hit
+        entry = _build(key)
+        with _lock:
+            _entries[key] = entry
+        return entry
+
+
+def record(player_id, game_id, points, game_date):
+    """
+    Record a concluded game for the player's distribution: stored with
+    the game-log cache, and folded into this process's entry if it is
+    loaded (nothing is built just to add one game). DNPs (negative
+    points) and untracked game types are ignored. Returns True if the
+    game was recorded.
+    """
+    season_type = deduce_game_type(str(game_id))
+    if points is None or points < 0 or season_type not in TRACKED_SEASON_TYPES:
+        return False
+    key = (int(player_id), season_of(game_date), season_type)
+    record_settled_game(*key, game_id, points)
+    with _lock:
+        entry = _entries.get(key)
+    if entry is not None:
+        entry.add(game_id, points)
+    return True
+
+
+def invalidate(player_id=None):
+    """Drop one player's distributions (or everyone's)."""
+    with _lock:
+        if player_id is None:
+            _entries.clear()
+        else:
+            for key in [k for k in _entries if k[0] == int(player_id)]:
+                del _entries[key]
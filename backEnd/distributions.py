@@ -0,0 +1,75 @@
+"""
+distributions.py
+────────────────
+The one definition of a prop's "over", and the exact tails behind it.
+
+A pick at line `t` wins when the player scores strictly more than `t`:
+
+    over  <=>  X > t        (for whole-point scores: X >= floor(t) + 1)
+
+so 24.5 and 24 are both cleared by 25, and 25 is not cleared by 25.
+Settlement (`finalPoints > threshold`), the under-counts (`points <= t`)
+and every probability below use this definition.
+
+All functions take scalars or NumPy arrays (broadcast together) and
+return a float for scalar input, an array otherwise – a whole board is
+one call. The Poisson tail is the regularized lower incomplete gamma
+function, P(X > k) = P(k + 1, λ), which is exact without summing terms
+and stays accurate for large λ and k.
+"""
+
+import numpy as np
+from scipy import special, stats
+
+
+def _out(values, *inputs):
+    if all(np.ndim(x) == 0 for x in inputs):
+        return float(values)
+    return values
+
+
+def over_count(threshold):
+    """Smallest whole-point score that clears `threshold`."""
+    return _out(np.floor(np.asarray(threshold, dtype=float)) + 1, threshold)
+
+
+def poisson_over(lam, threshold):
+    """P(X > threshold) for X ~ Poisson(lam)."""
+    lam_a = np.asarray(lam, dtype=float)
+    k = np.floor(np.asarray(threshold, dtype=float))
+    lam_a, k = np.broadcast_arrays(lam_a, k)
+    with np.errstate(invalid="ignore"):
+        tail = special.gammainc(np.maximum(k, 0) + 1, np.maximum(lam_a, 0))
+    p = np.where(k < 0, 1.0, np.where(lam_a > 0, tail, 0.0))
+    return _out(p, lam, threshold)
+
+
+def poisson_pmf(k, lam):
+    """P(X = k) for X ~ Poisson(lam), computed in log space."""
+    k_a = np.asarray(k, dtype=float)
+    lam_a = np.asarray(lam, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = np.exp(special.xlogy(k_a, lam_a) - lam_a - special.gammaln(k_a + 1))
+    return _out(np.where(k_a < 0, 0.0, p), k, lam)
+
+
+def normal_over(mu, sigma, threshold):
+    """P(X > threshold) for X ~ N(mu, sigma); sigma <= 0 is a point mass at mu."""
+    mu_a, sigma_a, t = np.broadcast_arrays(
+        np.asarray(mu, dtype=float), np.asarray(sigma, dtype=float),
+        np.asarray(threshold, dtype=float),
+    )
+    spread = sigma_a > 0
+    p = stats.norm.sf(t, loc=mu_a, scale=np.where(spread, sigma_a, 1.0))
+    p = np.where(spread, p, (mu_a > t).astype(float))
+    return _out(p, mu, sigma, threshold)
+
+
+def empirical_over(samples, threshold, presorted=False):
+    """Share of `samples` strictly above each threshold (binary search)."""
+    s = np.asarray(samples, dtype=float)
+    s = s if presorted else np.sort(s)
+    t = np.asarray(threshold, dtype=float)
+    if len(s) == 0:
+        return _out(np.full(t.shape, np.nan), threshold)
+    return _out(1.0 - np.searchsorted(s, t, side="right") / len(s), threshold)
@@ -0,0 +1,87 @@
+"""
+fetch_planner.py
+────────────────
+Runs a request's upstream fetches as a small dependency graph.
+
+• `run_plan` takes {name: FetchTask} and starts every task as soon as the
+  tasks it depends on have finished, on a bounded thread pool – latency
+  is the critical path instead of the sum of all calls.
+• `host_slot(host)` caps how many requests are in flight per upstream
+  host across the whole process (stats.nba.com throttles aggressively).
+  Wrap the actual network call, not cache lookups.
+"""
+
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Tuple
+
+NBA_STATS = "stats.nba.com"
+BALLDONTLIE = "api.balldontlie.io"
+ESPN = "site.api.espn.com"
+
+HOST_LIMITS = {
+    NBA_STATS:   int(os.getenv("NBA_STATS_CONCURRENCY", "3")),
+    BALLDONTLIE: int(os.getenv("BALLDONTLIE_CONCURRENCY", "4")),
+    ESPN:        int(os.getenv("ESPN_CONCURRENCY", "4")),
+}
+MAX_WORKERS = int(os.getenv("FETCH_PLAN_WORKERS", "8"))
+
+_host_semaphores = {h: threading.BoundedSemaphore(n) for h, n in HOST_LIMITS.items()}
+
+
+@contextmanager
+def host_slot(host):
+    """Hold one of `host`'s concurrency slots for the duration of the block."""
+    sem = _host_semaphores.get(host)
+    if sem is None:
+        yield
+        return
+    with sem:
+        yield
+
+
+@dataclass
+class FetchTask:
+    """`fn` is called with the results of `deps`, in order."""
+    fn: Callable[..., Any]
+    deps: Tuple[str, ...] = field(default_factory=tuple)
+
+
+def run_plan(tasks: Dict[str, FetchTask], max_workers: int = MAX_WORKERS) -> Dict[str, Any]:
+    """
+    Execute every task once its dependencies are done and return
+    {name: result}. The first task to raise cancels everything not yet
+    started and its exception propagates to the caller.
+    """
+    for name, task in tasks.items():
+        missing = [d for d in task.deps if d not in tasks]
+        if missing:
+            raise ValueError(f"Task {name!r} depends on unknown task(s) {missing}")
+
+    results = {}
+    pending = dict(tasks)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            ready = [n for n, t in pending.items() if all(d in results for d in t.deps)]
+            if not ready and not running:
+                raise ValueError(f"Dependency cycle among {sorted(pending)}")
+            for name in ready:
+                task = pending.pop(name)
+                args = [results[d] for d in task.deps]
+                running[pool.submit(task.fn, *args)] = name
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                try:
+                    results[name] = fut.result()
+                except BaseException:
+                    for other in running:
+                        other.cancel()
+                    raise
+    return results
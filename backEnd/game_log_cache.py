@@ -0,0 +1,230 @@
+"""
+game_log_cache.py
+─────────────────
+One cache in front of every `PlayerGameLog` request.
+
+• Keyed by (player_id, season, season_type).
+• Tier 1 is a per-process dict; tier 2 is an optional SQLite file
+  (set `GAME_LOG_CACHE_DB`) so every gunicorn worker shares one copy.
+• Concluded games recorded at settlement (`record_settled_game`) are kept
+  alongside, for readers that need them before the next log refetch.
+• Every entry is stamped with the Eastern date it was fetched on. The
+  current season is refetched once that date rolls over, i.e. as soon as
+  a new game day starts. A past season never expires once it was fetched
+  after the season was over (see `season_is_final`); a copy taken
+  mid-season is refetched once.
+
+Frames handed out are shared between callers – treat them as read-only.
+"""
+
+import datetime
+import io
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+import pytz
+from nba_api.stats.endpoints import PlayerGameLog
+
+from fetch_planner import NBA_STATS, host_slot
+
+_EASTERN = pytz.timezone("America/New_York")
+_DB_PATH = os.getenv("GAME_LOG_CACHE_DB")  # e.g. /tmp/game_logs.sqlite3
+
+_memory = {}                # key -> (as_of, DataFrame)
+_memory_lock = threading.Lock()
+_key_locks = {}             # key -> Lock, so one fetch per key at a time
+_settled = {}               # key -> {game_id: points}; used without the SQLite tier
+
+
+def _today_eastern():
+    return datetime.datetime.now(_EASTERN).date()
+
+
+def _current_season():
+    now = datetime.datetime.now()
+    start = now.year if now.month >= 10 else now.year - 1
+    return f"{start}-{str(start + 1)[-2:]}"
+
+
+SEASON_FINAL_MONTH = 7      # July 1 after the season: the Finals are over
+
+
+def season_is_final(season, as_of):
+    """True if data for `season` ('2024-25') fetched on `as_of` is complete."""
+    end_year = int(season[:4]) + 1
+    return as_of >= datetime.date(end_year, SEASON_FINAL_MONTH, 1)
+
+
+def _is_fresh(season, as_of):
+    """Completed seasons are immutable; the current one is good for its game day."""
+    as_of = datetime.date.fromisoformat(as_of)
+    if season != _current_season():
+        return season_is_final(season, as_of)
+    return as_of == _today_eastern()
+
+
+############################################################################
+### SQLite tier (optional)
+############################################################################
+
+def _connect():
+    conn = sqlite3.connect(_DB_PATH, timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS game_logs ("
+        " player_id INTEGER, season TEXT, season_type TEXT,"
+        " as_of TEXT, payload TEXT,"
+        " PRIMARY KEY (player_id, season, season_type))"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS settled_games ("
+        " player_id INTEGER, season TEXT, season_type TEXT,"
+        " game_id TEXT, points REAL,"
+        " PRIMARY KEY (player_id, season, season_type, game_id))"
+    )
+    return conn
+
+
+def _disk_get(key):
+    if not _DB_PATH:
+        return None
+    try:
+        with _connect() as conn:
+            row = conn.execute(
+                "SELECT as_of, payload FROM game_logs"
+                " WHERE player_id=? AND season=? AND season_type=?",
+                key,
+            ).fetchone()
+    except sqlite3.Error as e:
+        print(f"[game_log_cache] disk read failed for {key}: {e}")
+        return None
+    if row is None:
+        return None
+    as_of, payload = row
+    # keep ids / dates as strings exactly like nba_api returns them
+    df = pd.read_json(io.StringIO(payload), orient="split", dtype=False)
+    return as_of, df
+
+
+def _disk_put(key, as_of, df):
+    if not _DB_PATH:
+        return
+    try:
+        with _connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO game_logs VALUES (?, ?, ?, ?, ?)",
+                (*key, as_of, df.to_json(orient="split", index=False)),
+            )
+    except sqlite3.Error as e:
+        print(f"[game_log_cache] disk write failed for {key}: {e}")
+
+
+############################################################################
+### Public API
+############################################################################
+
+def _lock_for(key):
+    with _memory_lock:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+def get_player_game_log(player_id, season, season_type="Regular Season"):
+    """
+    Return the `PlayerGameLog` frame for (player_id, season, season_type),
+    most recent game first – exactly what
+    `PlayerGameLog(...).get_data_frames()[0]` returns.
+
+    Upstream errors propagate and are never cached.
+    """
+    key = (int(player_id), str(season), season_type)
+
+    with _memory_lock:
+        hit = _memory.get(key)
+    if hit and _is_fresh(key[1], hit[0]):
+        return hit[1]
+
+    with _lock_for(key):
+        # another thread may have filled it while we waited
+        with _memory_lock:
+            hit = _memory.get(key)
+        if hit and _is_fresh(key[1], hit[0]):
+            return hit[1]
+
+        hit = _disk_get(key)
+        if hit and _is_fresh(key[1], hit[0]):
+            with _memory_lock:
+                _memory[key] = hit
+            return hit[1]
+
+        as_of = _today_eastern().isoformat()
+        with host_slot(NBA_STATS):
+            df = PlayerGameLog(
+                player_id=key[0],
+                season=key[1],
+                season_type_all_star=season_type,
+            ).get_data_frames()[0]
+
+        with _memory_lock:
+            _memory[key] = (as_of, df)
+        _disk_put(key, as_of, df)
+        return df
+
+
+def record_settled_game(player_id, season, season_type, game_id, points):
+    """
+    Remember a concluded game's points for (player_id, season, season_type).
+    With the SQLite tier every worker sees it; without, only this process.
+    """
+    key = (int(player_id), str(season), season_type)
+    if not _DB_PATH:
+        with _memory_lock:
+            _settled.setdefault(key, {})[str(game_id)] = float(points)
+        return
+    try:
+        with _connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO settled_games VALUES (?, ?, ?, ?, ?)",
+                (*key, str(game_id), float(points)),
+            )
+    except sqlite3.Error as e:
+        print(f"[game_log_cache] settled-game write failed for {key}: {e}")
+
+
+def settled_games(player_id, season, season_type="Regular Season"):
+    """{game_id: points} recorded with record_settled_game()."""
+    key = (int(player_id), str(season), season_type)
+    if not _DB_PATH:
+        with _memory_lock:
+            return dict(_settled.get(key, {}))
+    try:
+        with _connect() as conn:
+            rows = conn.execute(
+                "SELECT game_id, points FROM settled_games"
+                " WHERE player_id=? AND season=? AND season_type=?",
+                key,
+            ).fetchall()
+    except sqlite3.Error as e:
+        print(f"[game_log_cache] settled-game read failed for {key}: {e}")
+        return {}
+    return dict(rows)
+
+
+def is_cached(player_id, season, season_type="Regular Season"):
+    """True if a fresh copy is available without a network call."""
+    key = (int(player_id), str(season), season_type)
+    with _memory_lock:
+        hit = _memory.get(key)
+    if hit is None:
+        hit = _disk_get(key)
+    return bool(hit) and _is_fresh(key[1], hit[0])
+
+
+def invalidate(player_id=None):
+    """Drop cached logs for one player (or everyone) from memory."""
+    with _memory_lock:
+        if player_id is None:
+            _memory.clear()
+        else:
+            for key in [k for k in _memory if k[0] == int(player_id)]:
+                del _memory[key]
@@ -0,0 +1,84 @@
+"""
+game_log_frames.py
+──────────────────
+Columnar transform for nba_api game logs.
+
+`annotate()` derives, in one vectorized pass over a `PlayerGameLog` frame:
+
+    LOCATION       'Home' / 'Away' / 'Unknown'   (from MATCHUP)
+    OPP_ABBR       opponent abbreviation or None
+    OPP_FULL_NAME  team full name (falls back to the abbreviation)
+    OPP_ID         NBA team id or None
+    OPP_LOGO       logo URL or None
+    MINUTES        whole minutes as int ("MM:SS" keeps the minute part)
+
+`game_rows()` is the thin dict view the API responses are built from.
+"""
+
+import numpy as np
+import pandas as pd
+
+import team_registry
+
+_FULL_NAME_BY_ABBR = {abbr: t["full_name"] for abbr, t in team_registry.BY_ABBR.items()}
+_ID_BY_ABBR = {abbr: t["id"] for abbr, t in team_registry.BY_ABBR.items()}
+
+# output key -> annotated column
+GAME_FIELDS = {
+    "gameId":           "Game_ID",
+    "date":             "GAME_DATE",
+    "points":           "PTS",
+    "opponent":         "OPP_ABBR",
+    "opponentFullName": "OPP_FULL_NAME",
+    "opponentLogo":     "OPP_LOGO",
+    "location":         "LOCATION",
+    "minutes":          "MINUTES",
+}
+
+
+def _minutes(raw):
+    if pd.api.types.is_numeric_dtype(raw):
+        return raw.fillna(0).astype(int)
+    head = raw.astype(str).str.split(":", n=1).str[0]
+    return pd.to_numeric(head, errors="coerce").fillna(0).astype(int)
+
+
+def annotate(games_df):
+    """Copy of `games_df` with the derived columns above added."""
+    out = games_df.copy()
+    if out.empty:
+        for col in ("LOCATION", "OPP_ABBR", "OPP_FULL_NAME", "OPP_ID", "OPP_LOGO", "MINUTES"):
+            out[col] = pd.Series(dtype=object)
+        return out
+
+    parts = out["MATCHUP"].astype(str).str.extract(r" (vs\.|@) (.+)$")
+    out["LOCATION"] = np.select(
+        [parts[0] == "vs.", parts[0] == "@"], ["Home", "Away"], default="Unknown"
+    )
+    opp = parts[1].astype(object).where(parts[1].notna(), None)
+    out["OPP_ABBR"] = opp
+    out["OPP_FULL_NAME"] = opp.map(_FULL_NAME_BY_ABBR).where(opp.isin(_FULL_NAME_BY_ABBR.keys()), opp)
+    ids = opp.map(_ID_BY_ABBR).astype("Int64")
+    out["OPP_ID"] = ids.astype(object).where(ids.notna(), None)
+    logos = "https://cdn.nba.com/logos/nba/" + ids.astype(str) + "/global/L/logo.svg"
+    out["OPP_LOGO"] = logos.astype(object).where(ids.notna(), None)
+    out["MINUTES"] = _minutes(out["MIN"]) if "MIN" in out else 0
+    return out
+
+
+def game_rows(annotated, game_type, fields=GAME_FIELDS, include_game_id=True):
+    """List of plain-Python dicts (JSON / Firestore safe), one per game."""
+    if annotated.empty:
+        return []
+    fields = {k: v for k, v in fields.items() if include_game_id or k != "gameId"}
+    view = annotated[list(fields.values())]
+    view = view.astype(object).where(view.notna(), None)
+    view.columns = list(fields.keys())
+    rows = view.to_dict("records")
+    for row in rows:
+        if row.get("points") is not None:
+            row["points"] = int(row["points"])
+        if row.get("minutes") is not None:
+            row["minutes"] = int(row["minutes"])
+        row["gameType"] = game_type
+    return rows
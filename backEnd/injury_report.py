@@ -5,9 +5,11 @@ import pytz
 import logging
 import nba_api
 from nba_api.stats.endpoints import TeamGameLog
-from nba_api.stats.endpoints import playergamelog
-from nba_api.stats.static import teams, players
+from nba_api.stats.static import players
 import requests
+from game_log_cache import get_player_game_log
+from game_log_frames import annotate
+import team_registry
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -41,8 +43,7 @@ def get_ids(first_name, last_name):
         return {"error": f"No matching NBA Stats player found for {full_name}"}
     nba_player_id = nba_found[0]["id"]
     player_team = bdl_player["team"]["full_name"] if bdl_player.get("team") else "Unknown Team"
-    player_team_standings = teams.find_teams_by_full_name(player_team)[0]
-    player_team_id = player_team_standings["id"]
+    player_team_id = team_registry.lookup(player_team)["id"]
 
     return nba_player_id, player_team_id
 
@@ -61,20 +62,12 @@ def fetch_player_game_stats(nba_player_id, season_str):
     Fetches advanced game logs for the specified NBA player (by official nba_api ID).
     Returns per-game stats including FGM, FGA, 3PA, 3PM, etc.
     """
-    fga = fta = tov = minutes = 0
-    gamelog_df = playergamelog.PlayerGameLog(player_id=nba_player_id, season=season_str).get_data_frames()[0]
+    gamelog_df = annotate(get_player_game_log(nba_player_id, season_str))
+    if gamelog_df.empty:
+        raise ValueError(f"No games for player {nba_player_id} in {season_str}")
 
-
-    for idx, row in gamelog_df.iterrows():
-        fga += row.get("FGA", 0)
-        fta += row.get("FTA", 0)
-        tov += row.get("TOV", 0)
-        minutes += row.get("MIN", 0)
-
-    fga /= len(gamelog_df)
-    fta /= len(gamelog_df)
-    tov /= len(gamelog_df)
-    minutes /= len(gamelog_df)
+    means = gamelog_df[["FGA", "FTA", "TOV", "MINUTES"]].mean()
+    fga, fta, tov, minutes = (float(means[c]) for c in ("FGA", "FTA", "TOV", "MINUTES"))
 
     return fga, fta, tov, minutes
 
@@ -300,8 +293,8 @@ def get_player_injury_status_new(player_name, player_team, opponent_team):
     db = firestore.client()
 
     # ── 2. Pull both reports ───────────────────────────────────────────────
-    team_key  = player_team.lower().replace(" ", "_").replace(".", "")
-    opp_key   = opponent_team.lower().replace(" ", "_").replace(".", "") if opponent_team else None
+    team_key  = team_registry.firestore_key(player_team)
+    opp_key   = team_registry.firestore_key(opponent_team) if opponent_team else None
 
     team_injuries     = get_team_injury_report_new(team_key, db)              # may be {}, {'status': 'NOT YET SUBMITTED'}, or {player: {...}}
     opponent_injuries = get_team_injury_report_new(opp_key,  db) if opp_key else {}
@@ -0,0 +1,279 @@
+"""
+job_queue.py
+────────────
+Background jobs for long-running work (cold prop analyses), so an HTTP
+worker only has to enqueue and later answer status polls.
+
+    queue = JobQueue(make_store("sqlite"))
+    job_id = queue.submit("player", payload, run)      # returns at once
+    queue.status(job_id)  # {"id", "kind", "status", "progress", "results", ...}
+
+`run(payload, report)` executes on a bounded thread pool (`JOB_WORKERS`)
+and calls `report(done, total, result)` as pieces finish; each result is
+appended to the job's partial results. Status goes
+queued → running → done | error.
+
+Jobs run on threads of the process that accepted them. While a job is
+queued or running that process refreshes its `updatedAt` every
+`JOB_HEARTBEAT_SECONDS`; if the process dies (worker recycled, instance
+scaled down) the heartbeat stops, and `status()` reports the job as
+error once `updatedAt` is older than `JOB_STALE_SECONDS`.
+
+Job state lives in a `JobStore`:
+    MemoryJobStore     – one process only (tests / local runs)
+    SQLiteJobStore     – shared by the workers on one host (JOB_STORE_PATH)
+    FirestoreJobStore  – shared by every instance (collection "analysisJobs")
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", str(24 * 3600)))
+JOB_HEARTBEAT_SECONDS = int(os.getenv("JOB_HEARTBEAT_SECONDS", "15"))
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", str(8 * JOB_HEARTBEAT_SECONDS)))
+JOB_STORE_PATH = os.getenv(
+    "JOB_STORE_PATH", os.path.join(tempfile.gettempdir(), "lambdarim_jobs.sqlite")
+)
+
+QUEUED, RUNNING, DONE, ERROR = "queued", "running", "done", "error"
+
+
+############################################################################
+### STORES
+############################################################################
+
+class JobStore(ABC):
+    """Where job records live. Records are plain JSON-safe dicts."""
+
+    @abstractmethod
+    def create(self, job):
+        ...
+
+    @abstractmethod
+    def update(self, job_id, **fields):
+        ...
+
+    @abstractmethod
+    def append_result(self, job_id, result, **fields):
+        """Append to job["results"] and apply `fields` in one step."""
+
+    @abstractmethod
+    def get(self, job_id):
+        ...
+
+
+class MemoryJobStore(JobStore):
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _prune(self):
+        cutoff = time.time() - JOB_TTL_SECONDS
+        for job_id in [j for j, job in self._jobs.items() if job["createdAt"] < cutoff]:
+            del self._jobs[job_id]
+
+    def create(self, job):
+        with self._lock:
+            self._prune()
+            self._jobs[job["id"]] = json.loads(json.dumps(job))
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def append_result(self, job_id, result, **fields):
+        with self._lock:
+            job = self._jobs[job_id]
+            job["results"].append(result)
+            job.update(fields)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return json.loads(json.dumps(job)) if job else None
+
+
+class SQLiteJobStore(JobStore):
+    def __init__(self, path=JOB_STORE_PATH):
+        self._path = path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, created_at REAL, body TEXT)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self._path, timeout=30)
+
+    def _write(self, conn, job):
+        conn.execute(
+            "INSERT OR REPLACE INTO jobs (id, created_at, body) VALUES (?, ?, ?)",
+            (job["id"], job["createdAt"], json.dumps(job)),
+        )
+
+    def _modify(self, job_id, change):
+        with self._lock, self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")      # serialize writers across workers
+            row = conn.execute("SELECT body FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            job = json.loads(row[0])
+            change(job)
+            self._write(conn, job)
+
+    def create(self, job):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM jobs WHERE created_at < ?", (time.time() - JOB_TTL_SECONDS,))
+            self._write(conn, job)
+
+    def update(self, job_id, **fields):
+        self._modify(job_id, lambda job: job.update(fields))
+
+    def append_result(self, job_id, result, **fields):
+        def change(job):
+            job["results"].append(result)
+            job.update(fields)
+        self._modify(job_id, change)
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT body FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+class FirestoreJobStore(JobStore):
+    def __init__(self, db, collection="analysisJobs"):
+        from google.cloud.firestore_v1 import ArrayUnion   # only needed for this store
+        self._ArrayUnion = ArrayUnion
+        self._coll = db.collection(collection)
+
+    def create(self, job):
+        # "expireAt" lets a Firestore TTL policy clean finished jobs up
+        expire_at = datetime.datetime.fromtimestamp(job["createdAt"] + JOB_TTL_SECONDS, datetime.timezone.utc)
+        self._coll.document(job["id"]).set({**job, "expireAt": expire_at})
+
+    def update(self, job_id, **fields):
+        self._coll.document(job_id).update(fields)
+
+    def append_result(self, job_id, result, **fields):
+        self._coll.document(job_id).update({"results": self._ArrayUnion([result]), **fields})
+
+    def get(self, job_id):
+        snap = self._coll.document(job_id).get()
+        if not snap.exists:
+            return None
+        job = snap.to_dict()
+        job.pop("expireAt", None)
+        return job
+
+
+def make_store(kind=None, db=None):
+    """JobStore named by `kind` (default: the JOB_STORE env var, else "memory")."""
+    kind = (kind or os.getenv("JOB_STORE", "memory")).lower()
+    if kind == "memory":
+        return MemoryJobStore()
+    if kind == "sqlite":
+        return SQLiteJobStore()
+    if kind == "firestore":
+        if db is None:
+            raise ValueError("FirestoreJobStore needs a Firestore client")
+        return FirestoreJobStore(db)
+    raise ValueError(f"Unknown JOB_STORE {kind!r}")
+
+
+############################################################################
+### QUEUE
+############################################################################
+
+class JobQueue:
+    def __init__(self, store, max_workers=JOB_WORKERS):
+        self.store = store
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._live = set()              # ids queued or running in this process
+        self._live_lock = threading.Lock()
+        self._heartbeat = None
+
+    def submit(self, kind, payload, run):
+        """Record a queued job, schedule `run(payload, report)`, return its id."""
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        self.store.create({
+            "id": job_id,
+            "kind": kind,
+            "status": QUEUED,
+            "progress": {"done": 0, "total": None},
+            "results": [],
+            "error": None,
+            "createdAt": now,
+            "updatedAt": now,
+        })
+        with self._live_lock:
+            self._live.add(job_id)
+            self._start_heartbeat()
+        self._pool.submit(self._execute, job_id, payload, run)
+        return job_id
+
+    def status(self, job_id):
+        """The job record; a queued/running job without a recent heartbeat reads as error."""
+        job = self.store.get(job_id)
+        if job and job["status"] in (QUEUED, RUNNING):
+            silent = time.time() - job["updatedAt"]
+            if silent > JOB_STALE_SECONDS:
+                job["status"] = ERROR
+                job["error"] = f"worker lost: no heartbeat for {int(silent)}s"
+        return job
+
+    def _start_heartbeat(self):
+        # caller holds _live_lock
+        if self._heartbeat is None or not self._heartbeat.is_alive():
+            self._heartbeat = threading.Thread(target=self._beat, name="job-heartbeat", daemon=True)
+            self._heartbeat.start()
+
+    def _beat(self):
+        while True:
+            time.sleep(JOB_HEARTBEAT_SECONDS)
+            with self._live_lock:
+                live = list(self._live)
+                if not live:
+                    self._heartbeat = None
+                    return
+            for job_id in live:
+                try:
+                    self.store.update(job_id, updatedAt=time.time())
+                except Exception as e:
+                    print(f"[job_queue] heartbeat failed for {job_id}: {e}")
+
+    def _execute(self, job_id, payload, run):
+        try:
+            self._run(job_id, payload, run)
+        finally:
+            with self._live_lock:
+                self._live.discard(job_id)
+
+    def _run(self, job_id, payload, run):
+        self.store.update(job_id, status=RUNNING, updatedAt=time.time())
+
+        def report(done, total, result=None):
+            fields = {"progress": {"done": done, "total": total}, "updatedAt": time.time()}
+            if result is None:
+                self.store.update(job_id, **fields)
+            else:
+                self.store.append_result(job_id, result, **fields)
+
+        try:
+            run(payload, report)
+        except Exception as e:
+            print(f"[job_queue] job {job_id} failed: {e}")
+            self.store.update(job_id, status=ERROR, error=str(e), updatedAt=time.time())
+            return
+        self.store.update(job_id, status=DONE, updatedAt=time.time())
@@ -0,0 +1,114 @@
+/*
+ * mc_batch.c – batch Monte Carlo entry point for libmontecarlo.so
+ *
+ *   int mc_batch(const double *mus, const double *sigmas,
+ *                const double *thresholds, double *out, size_t n,
+ *                uint64_t sims, uint64_t seed, int threads);
+ *
+ * out[i] = P(N(mus[i], sigmas[i]) > thresholds[i]) estimated from `sims`
+ * draws. Arrays are contiguous doubles passed straight from NumPy.
+ *
+ * No global state: row i draws from its own xoshiro256** stream seeded
+ * with splitmix64(seed, i), so results depend only on (seed, inputs) –
+ * not on the thread count – and concurrent callers never share an RNG.
+ * Rows are split across `threads` pthreads (<= 1 runs inline); a thread
+ * that cannot be started runs its rows on the caller. Returns 0, or -1
+ * (out untouched) if an array pointer is NULL or sims is 0.
+ */
+
+#include <math.h>
+#include <pthread.h>
+#include <stddef.h>
+#include <stdint.h>
+
+static uint64_t splitmix64(uint64_t *x) {
+  uint64_t z = (*x += 0x9E3779B97F4A7C15ULL);
+  z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9ULL;
+  z = (z ^ (z >> 27)) * 0x94D049BB133111EBULL;
+  return z ^ (z >> 31);
+}
+
+static inline uint64_t rotl(uint64_t x, int k) { return (x << k) | (x >> (64 - k)); }
+
+typedef struct { uint64_t s[4]; } rng_t;
+
+static void rng_seed(rng_t *r, uint64_t seed, uint64_t stream) {
+  uint64_t x = seed ^ (stream * 0xD1B54A32D192ED03ULL);
+  for (int i = 0; i < 4; i++) r->s[i] = splitmix64(&x);
+}
+
+static inline uint64_t rng_next(rng_t *r) {
+  uint64_t *s = r->s;
+  uint64_t result = rotl(s[1] * 5, 7) * 9;
+  uint64_t t = s[1] << 17;
+  s[2] ^= s[0]; s[3] ^= s[1]; s[1] ^= s[2]; s[0] ^= s[3];
+  s[2] ^= t;
+  s[3] = rotl(s[3], 45);
+  return result;
+}
+
+/* uniform in (0, 1] – never 0, so log() below is finite */
+static inline double rng_uniform(rng_t *r) {
+  return ((rng_next(r) >> 11) + 1) * 0x1.0p-53;
+}
+
+static double row_prob(double mu, double sigma, double threshold,
+                       uint64_t sims, uint64_t seed, uint64_t row) {
+  rng_t r;
+  rng_seed(&r, seed, row);
+  /* P(mu + sigma*z > t) == P(z > (t - mu)/sigma): compare standard normals */
+  double cut = sigma > 0 ? (threshold - mu) / sigma : (mu > threshold ? -INFINITY : INFINITY);
+  uint64_t over = 0, i = 0;
+  for (; i + 1 < sims; i += 2) {            /* Box–Muller: two draws per pair */
+    double rad = sqrt(-2.0 * log(rng_uniform(&r)));
+    double ang = 6.283185307179586 * rng_uniform(&r);
+    over += (rad * cos(ang) > cut) + (rad * sin(ang) > cut);
+  }
+  if (i < sims) {
+    double rad = sqrt(-2.0 * log(rng_uniform(&r)));
+    over += rad * cos(6.283185307179586 * rng_uniform(&r)) > cut;
+  }
+  return sims ? (double)over / (double)sims : NAN;
+}
+
+typedef struct {
+  const double *mus, *sigmas, *thresholds;
+  double *out;
+  size_t begin, end;
+  uint64_t sims, seed;
+} job_t;
+
+static void *run_rows(void *arg) {
+  job_t *j = (job_t *)arg;
+  for (size_t i = j->begin; i < j->end; i++)
+    j->out[i] = row_prob(j->mus[i], j->sigmas[i], j->thresholds[i], j->sims, j->seed, i);
+  return NULL;
+}
+
+#define MC_MAX_THREADS 64
+
+int mc_batch(const double *mus, const double *sigmas, const double *thresholds,
+             double *out, size_t n, uint64_t sims, uint64_t seed, int threads) {
+  if (n && (!mus || !sigmas || !thresholds || !out || !sims)) return -1;
+  if (threads > MC_MAX_THREADS) threads = MC_MAX_THREADS;
+  if (threads > (int)n) threads = (int)n;
+  if (threads <= 1) {
+    job_t j = { mus, sigmas, thresholds, out, 0, n, sims, seed };
+    run_rows(&j);
+    return 0;
+  }
+
+  pthread_t tids[MC_MAX_THREADS];
+  job_t jobs[MC_MAX_THREADS];
+  int spawned[MC_MAX_THREADS] = {0};
+  size_t per = (n + threads - 1) / threads;
+  for (int t = 0; t < threads; t++) {
+    size_t begin = (size_t)t * per, end = begin + per < n ? begin + per : n;
+    jobs[t] = (job_t){ mus, sigmas, thresholds, out, begin < n ? begin : n, end, sims, seed };
+    spawned[t] = pthread_create(&tids[t], NULL, run_rows, &jobs[t]) == 0;
+    if (!spawned[t]) run_rows(&jobs[t]);     /* couldn't spawn: do it here */
+  }
+  for (int t = 0; t < threads; t++)
+    if (spawned[t]) pthread_join(tids[t], NULL);
+  return 0;
+}
@@ -0,0 +1,56 @@
+"""
+mc_benchmark.py
+───────────────
+Compare the Monte Carlo backends monte_carlo.py can use for normal rows
+(NumPy and, when libmontecarlo.so exports it, the native mc_batch) on
+synthetic boards, and check each against the exact normal tail.
+
+    python mc_benchmark.py                 # default sizes
+    python mc_benchmark.py --rows 1000 --sims 100000 --repeat 5
+    python mc_benchmark.py --save          # also record the winner
+
+--save writes the chosen backend (monte_carlo.choose_backend) to
+MC_BACKEND_FILE, which monte_carlo reads at import; the Docker build runs
+it once so every worker uses the same backend. MC_BACKEND=numpy|native
+overrides both.
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+import monte_carlo
+
+
+def run(rows, sims, repeat, save=False):
+    rng = np.random.default_rng(0)
+    mu = rng.uniform(8, 30, rows)
+    sigma = rng.uniform(3, 8, rows)
+    threshold = mu + rng.normal(0, 3, rows)
+    exact = monte_carlo.batch_monte_carlo(mu, sigma, threshold, method="exact")["prob_over"]
+
+    print(f"{rows} rows × {sims} sims, best of {repeat}; library: {monte_carlo._so_path or 'not found'}")
+    print(f"{'backend':<8} {'seconds':>9} {'rows/s':>10} {'max |err|':>10}")
+    timings = {}
+    for name, fn in monte_carlo.NORMAL_BACKENDS.items():
+        seconds = monte_carlo.time_backend(name, rows=rows, num_simulations=sims, repeat=repeat)
+        timings[name] = seconds
+        p = fn(mu, sigma, threshold, sims, np.random.default_rng(1))
+        print(f"{name:<8} {seconds:>9.4f} {rows / seconds:>10.0f} {np.abs(p - exact).max():>10.5f}")
+    choice = monte_carlo.choose_backend(timings)
+    print(f"selected at import: {monte_carlo.BACKEND}; benchmark picks: {choice}")
+    if save:
+        with open(monte_carlo.MC_BACKEND_FILE, "w") as f:
+            json.dump({"backend": choice, "timings": timings}, f)
+        print(f"saved to {monte_carlo.MC_BACKEND_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Monte Carlo backends")
+    parser.add_argument("--rows", type=int, default=256)
+    parser.add_argument("--sims", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", action="store_true", help="write the choice to MC_BACKEND_FILE")
+    args = parser.parse_args()
+    run(args.rows, args.sims, args.repeat, args.save)
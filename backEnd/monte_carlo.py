@@ -1,16 +1,37 @@
 import numpy as np
+from scipy.stats import qmc
 from nba_api.stats.static import players
 # Import helper functions from player_analyzer
 from player_analyzer import fetch_player_game_logs, get_current_season
+import distributions
+import distribution_store
+import json
 import os
-from ctypes import CDLL, c_double, c_uint64
+import time
+from ctypes import CDLL, c_int, c_size_t, c_uint64
 
-_ocaml_mc = None
-_so_path = os.path.join(os.path.dirname(__file__), "..", "libmontecarlo.so")
-if os.path.exists(_so_path):
-    _ocaml_mc = CDLL(_so_path)
-    _ocaml_mc.monte_carlo.argtypes = (c_double, c_double, c_double, c_uint64)
-    _ocaml_mc.monte_carlo.restype  = c_double
+# libmontecarlo.so sits next to this file in the container (Dockerfile
+# copies it into /app) and one level up in a local build; MC_LIBRARY
+# overrides both.
+_so_candidates = [
+    os.getenv("MC_LIBRARY"),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "libmontecarlo.so"),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "libmontecarlo.so"),
+]
+_native = None
+_so_path = next((p for p in _so_candidates if p and os.path.exists(p)), None)
+if _so_path:
+    try:
+        _native = CDLL(_so_path)
+    except OSError as e:
+        print(f"[monte_carlo] could not load {_so_path}: {e}")
+
+_mc_batch = None
+if _native is not None and hasattr(_native, "mc_batch"):
+    _f64 = np.ctypeslib.ndpointer(dtype=np.float64, ndim=1, flags="C_CONTIGUOUS")
+    _mc_batch = _native.mc_batch
+    _mc_batch.argtypes = (_f64, _f64, _f64, _f64, c_size_t, c_uint64, c_uint64, c_int)
+    _mc_batch.restype = c_int
 
 def get_player_game_data(player_name, max_games=60):
     """
@@ -38,6 +59,46 @@ def get_player_game_data(player_name, max_games=60):
     print(f"[monte_carlo] Found {len(points_only)} games for {player_name}")
     return points_only
 
+def simulate_points(mu, sigma,
+                    num_simulations=100_000,
+                    distribution="normal",
+                    rng=None):
+    """`num_simulations` draws from the player's normal or Poisson model."""
+    rng = rng if rng is not None else np.random.default_rng()
+    if distribution.lower() == "poisson":
+        return rng.poisson(lam=max(mu, 0.5), size=num_simulations)
+    return rng.normal(loc=mu, scale=sigma, size=num_simulations)
+
+
+def exceedance_curve(draws, thresholds, presorted=False):
+    """
+    P(X > t) for every t in `thresholds` from one set of draws.
+
+    The draws are sorted once; each threshold is then a binary search,
+    so a player's whole ladder of alt lines costs one simulation.
+    Returns {"thresholds", "prob_over", "std_err"} as arrays, std_err
+    being the binomial standard error sqrt(p(1-p)/n).
+    """
+    sorted_draws = np.asarray(draws) if presorted else np.sort(draws)
+    n = len(sorted_draws)
+    t = np.atleast_1d(np.asarray(thresholds, dtype=float))
+    if n == 0:
+        nan = np.full(t.shape, np.nan)
+        return {"thresholds": t, "prob_over": nan, "std_err": nan}
+    p = 1.0 - np.searchsorted(sorted_draws, t, side="right") / n
+    return {"thresholds": t, "prob_over": p, "std_err": np.sqrt(p * (1.0 - p) / n)}
+
+
+def monte_carlo_curve(mu, sigma,
+                      thresholds,
+                      num_simulations=100_000,
+                      distribution="normal",
+                      rng=None):
+    """Exceedance curve for a (μ, σ) model at every threshold, from one draw."""
+    draws = simulate_points(mu, sigma, num_simulations, distribution, rng)
+    return exceedance_curve(draws, thresholds)
+
+
 def run_monte_carlo_simulation(mu, sigma,
                                point_threshold,
                                num_simulations=100_000,
@@ -47,27 +108,19 @@ def run_monte_carlo_simulation(mu, sigma,
     that scoring exceeds `point_threshold`, using either
     a normal or a Poisson model.
     """
-    if distribution.lower() == "poisson":
-        lam = max(mu, 0.5)
-        simulated = np.random.poisson(lam=lam, size=num_simulations)
-    else:
-        simulated = np.random.normal(loc=mu, scale=sigma, size=num_simulations)
-
-    count_over = np.sum(simulated > point_threshold)
-    return count_over / num_simulations
+    curve = monte_carlo_curve(mu, sigma, [point_threshold], num_simulations, distribution)
+    return float(curve["prob_over"][0])
 
 def monte_carlo_for_player(player_name,
                            point_threshold,
-                           distribution="normal",
-                           num_simulations=100_000):
+                           distribution="normal"):
     """
-    Orchestrates fetching data and running the simulation.
+    Orchestrates fetching data and evaluating the player's model.
 
     Parameters:
       - player_name (str)
       - point_threshold (float): **required**; no more default of 25
       - distribution (str): "normal" or "poisson"
-      - num_simulations (int): how many samples to draw
 
     Returns:
       - probability (float) or None if no data
@@ -79,26 +132,287 @@ def monte_carlo_for_player(player_name,
         print(f"[monte_carlo] ERROR: invalid threshold {point_threshold}")
         return None
 
-    player_points = get_player_game_data(player_name)
-    if not player_points:
+    moments = player_point_moments(player_name)
+    if moments is None:
+        return None
+    mu, sigma = moments
+    return monte_carlo_probability(mu, sigma, point_threshold,
+                                   distribution=distribution)
+
+
+def player_point_moments(player_name):
+    """(μ, σ) of the player's season points from the distribution store, or None."""
+    player_list = players.find_players_by_full_name(player_name)
+    if not player_list:
+        return None
+    try:
+        dist = distribution_store.get(player_list[0]["id"])
+    except Exception as e:
+        print(f"[monte_carlo] Could not load games for {player_name}: {e}")
+        return None
+    if not dist.count:
         print(f"[monte_carlo] No data for player: {player_name}.")
         return None
 
-    mu    = float(np.mean(player_points))
-    sigma = float(np.std(player_points, ddof=1))
-    if sigma < 0.0001:
+    mu    = float(dist.mean)
+    sigma = dist.std
+    if sigma is None or not sigma >= 0.0001:
         sigma = 0.5
+    return mu, float(sigma)
+
+
+def monte_carlo_probability(mu, sigma,
+                            point_threshold,
+                            distribution="normal"):
+    """
+    P(points > threshold) for known (μ, σ) – no data fetch.
+    Normal and Poisson models have exact answers (see prob_over), so
+    nothing is simulated.
+    """
+    model = {"distribution": distribution, "mu": mu, "sigma": sigma}
+    return float(prob_over(model, [float(point_threshold)])["prob_over"][0])
+
+
+############################################################################
+### PROBABILITY ENGINE (exact where possible, QMC otherwise)
+############################################################################
+
+QMC_TOLERANCE = float(os.getenv("QMC_TOLERANCE", "0.002"))   # 95% CI half-width
+QMC_MAX_POINTS = int(os.getenv("QMC_MAX_POINTS", str(2 ** 16)))   # per replicate
+QMC_REPLICATES = 8
+_QMC_START_POINTS = 2 ** 10
+
+
+def _result(thresholds, p, method, std_err=None, samples=0):
+    return {
+        "thresholds": thresholds,
+        "prob_over": p,
+        "std_err": np.zeros_like(p) if std_err is None else std_err,
+        "method": method,
+        "samples": samples,
+    }
+
+
+def prob_over(model, thresholds, tol=QMC_TOLERANCE, max_points=QMC_MAX_POINTS, seed=None):
+    """
+    P(X > t) for every t in `thresholds` under `model`:
+
+      {"distribution": "normal",  "mu", "sigma"}   exact – normal survival function
+      {"distribution": "poisson", "mu"}            exact – Poisson CDF (λ floored at 0.5)
+      {"distribution": "empirical", "samples"}     exact for the empirical distribution
+                                                   (what a bootstrap of `samples` estimates)
+      {"distribution": "mixture", "components": [(weight, model), ...]}
+                                                   weighted sum of the components
+      {"ppf": callable}                            anything else with a quantile function –
+                                                   scrambled Sobol QMC, doubled until the 95%
+                                                   CI half-width is <= `tol`
+
+    Returns {"thresholds", "prob_over", "std_err", "method", "samples"};
+    std_err is 0 for exact methods and the replicate QMC error otherwise.
+    """
+    t = np.atleast_1d(np.asarray(thresholds, dtype=float))
+    if "ppf" in model:
+        return _qmc_prob_over(model["ppf"], t, tol, max_points, seed)
+
+    kind = model.get("distribution", "normal").lower()
+    if kind == "normal":
+        p = distributions.normal_over(model["mu"], model["sigma"], t)
+        return _result(t, p, "normal")
+    if kind == "poisson":
+        p = distributions.poisson_over(max(model["mu"], 0.5), t)
+        return _result(t, p, "poisson")
+    if kind in ("empirical", "bootstrap"):
+        p = distributions.empirical_over(model["samples"], t)
+        return _result(t, p, "empirical")
+    if kind == "mixture":
+        weights = np.array([w for w, _ in model["components"]], dtype=float)
+        weights = weights / weights.sum()
+        parts = [prob_over(m, t, tol, max_points, seed) for _, m in model["components"]]
+        p = sum(w * part["prob_over"] for w, part in zip(weights, parts))
+        se = np.sqrt(sum((w * part["std_err"]) ** 2 for w, part in zip(weights, parts)))
+        return _result(t, p, "mixture", se, sum(part["samples"] for part in parts))
+    raise ValueError(f"Unknown distribution {kind!r}")
+
+
+def _qmc_prob_over(ppf, t, tol, max_points, seed):
+    """
+    Randomized QMC: QMC_REPLICATES independently scrambled Sobol streams
+    pushed through `ppf`; their spread gives the standard error. Each
+    round doubles the points (keeping Sobol's balance) until the widest
+    95% CI over all thresholds is within `tol` or `max_points` is hit.
+    """
+    rng = np.random.default_rng(seed)
+    engines = [qmc.Sobol(d=1, scramble=True, seed=rng) for _ in range(QMC_REPLICATES)]
+    over = np.zeros((QMC_REPLICATES, len(t)))
+    n = 0
+    while True:
+        batch = n or _QMC_START_POINTS
+        for r, engine in enumerate(engines):
+            x = np.sort(ppf(engine.random(batch)[:, 0]))
+            over[r] += batch - np.searchsorted(x, t, side="right")
+        n += batch
+        estimates = over / n
+        p = estimates.mean(axis=0)
+        se = estimates.std(axis=0, ddof=1) / np.sqrt(QMC_REPLICATES)
+        if 1.96 * se.max() <= tol or n >= max_points:
+            return _result(t, p, "qmc", se, n * QMC_REPLICATES)
+
+
+############################################################################
+### BATCH MONTE CARLO (many players, one vectorized call)
+############################################################################
+
+MC_MEMORY_BUDGET_BYTES = int(os.getenv("MC_MEMORY_BUDGET_BYTES", str(256 * 2 ** 20)))
+
+
+def batch_monte_carlo(mu, sigma, threshold,
+                      distribution="normal",
+                      num_simulations=100_000,
+                      seed=None,
+                      memory_budget=MC_MEMORY_BUDGET_BYTES,
+                      method="simulate"):
+    """
+    P(points > threshold) for N props at once.
+
+    `mu`, `sigma`, `threshold` and `distribution` are scalars or
+    length-N arrays (broadcast together). With method="simulate" the
+    normal rows go through the selected backend (`BACKEND`: chunked
+    NumPy draws under `memory_budget` bytes, or the native mc_batch) and
+    Poisson rows through chunked NumPy draws, all seeded from one
+    `np.random.Generator(seed)` – same seed, inputs, backend and budget
+    give the same numbers. method="exact" evaluates the closed forms
+    (see prob_over) with the same broadcasting and no draws.
+
+    Returns {"prob_over", "std_err"} arrays of length N.
+    """
+    mu, sigma, threshold, distribution = np.broadcast_arrays(
+        np.asarray(mu, dtype=float), np.asarray(sigma, dtype=float),
+        np.asarray(threshold, dtype=float), np.char.lower(np.asarray(distribution, dtype=str)),
+    )
+    mu, sigma, threshold, distribution = (a.ravel() for a in (mu, sigma, threshold, distribution))
+    is_poisson = distribution == "poisson"
+    lam = np.maximum(mu, 0.5)
+
+    if method == "exact":
+        p = np.where(is_poisson,
+                     distributions.poisson_over(lam, threshold),
+                     distributions.normal_over(mu, sigma, threshold))
+        return {"prob_over": p, "std_err": np.zeros_like(p)}
+
+    rng = np.random.default_rng(seed)
+    over = np.empty(len(mu))
+    normal = ~is_poisson
+    if normal.any():
+        over[normal] = _simulate_normal_rows(
+            mu[normal], sigma[normal], threshold[normal], num_simulations, rng, memory_budget
+        ) * num_simulations
+    if is_poisson.any():
+        rows_per_chunk = max(1, memory_budget // (num_simulations * 8))
+        idx = np.flatnonzero(is_poisson)
+        for start in range(0, len(idx), rows_per_chunk):
+            rows = idx[start:start + rows_per_chunk]
+            draws = rng.poisson(lam[rows, None], size=(len(rows), num_simulations))
+            over[rows] = (draws > threshold[rows, None]).sum(axis=1)
+    p = over / num_simulations
+    return {"prob_over": p, "std_err": np.sqrt(p * (1 - p) / num_simulations)}
+
+
+############################################################################
+### NORMAL-ROW BACKENDS (NumPy / native mc_batch), picked at import
+############################################################################
+
+MC_BACKEND = os.getenv("MC_BACKEND", "auto").lower()        # auto | native | numpy
+# `python mc_benchmark.py --save` times the backends once (the Docker build
+# does) and writes the winner here; every worker then reads the same choice.
+MC_BACKEND_FILE = os.getenv(
+    "MC_BACKEND_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "mc_backend.json"),
+)
+NATIVE_PREFERENCE_MARGIN = 1.25    # native wins unless NumPy is >25% faster
+MC_NATIVE_THREADS = int(os.getenv("MC_NATIVE_THREADS", str(os.cpu_count() or 1)))
+
+
+def numpy_normal_rows(mu, sigma, threshold, num_simulations, rng, memory_budget=MC_MEMORY_BUDGET_BYTES):
+    """P(N(mu, sigma) > threshold) per row, chunked (rows × sims) NumPy draws."""
+    rows_per_chunk = max(1, memory_budget // (num_simulations * 8))
+    p = np.empty(len(mu))
+    for start in range(0, len(mu), rows_per_chunk):
+        sl = slice(start, start + rows_per_chunk)
+        z = rng.standard_normal((len(p[sl]), num_simulations))
+        p[sl] = (mu[sl, None] + sigma[sl, None] * z > threshold[sl, None]).mean(axis=1)
+    return p
+
+
+def native_normal_rows(mu, sigma, threshold, num_simulations, rng, memory_budget=None,
+                       threads=MC_NATIVE_THREADS):
+    """
+    Same as numpy_normal_rows via libmontecarlo's mc_batch (zero-copy,
+    per-call seed). A failed native call falls back to NumPy.
+    """
+    out = np.empty(len(mu))
+    seed = int(rng.integers(2 ** 63))
+    rc = _mc_batch(np.ascontiguousarray(mu, dtype=np.float64),
+                   np.ascontiguousarray(sigma, dtype=np.float64),
+                   np.ascontiguousarray(threshold, dtype=np.float64),
+                   out, len(out), num_simulations, seed, threads)
+    if rc != 0:
+        print(f"[monte_carlo] mc_batch failed (rc={rc}), falling back to numpy")
+        return numpy_normal_rows(mu, sigma, threshold, num_simulations, rng)
+    return out
+
+
+NORMAL_BACKENDS = {"numpy": numpy_normal_rows}
+if _mc_batch is not None:
+    NORMAL_BACKENDS["native"] = native_normal_rows
+
+
+def time_backend(name, rows=64, num_simulations=20_000, repeat=3):
+    """Best-of-`repeat` seconds for one backend on a synthetic board."""
+    rng = np.random.default_rng(0)
+    mu = rng.uniform(8, 30, rows)
+    sigma = rng.uniform(3, 8, rows)
+    threshold = mu + rng.normal(0, 3, rows)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        NORMAL_BACKENDS[name](mu, sigma, threshold, num_simulations, rng)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def choose_backend(timings):
+    """Backend for {name: seconds}; close timings go to native, so reruns agree."""
+    if "native" in timings and timings["native"] <= NATIVE_PREFERENCE_MARGIN * min(timings.values()):
+        return "native"
+    return min(timings, key=timings.get)
+
+
+def _saved_backend():
+    try:
+        with open(MC_BACKEND_FILE) as f:
+            return json.load(f).get("backend")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _select_backend():
+    """
+    MC_BACKEND if set, else the benchmark result saved in MC_BACKEND_FILE,
+    else native when the library has mc_batch. Nothing is timed here, so
+    every worker makes the same choice and a seed means the same draws.
+    """
+    if MC_BACKEND in NORMAL_BACKENDS:
+        return MC_BACKEND
+    if MC_BACKEND not in ("auto", "native"):
+        print(f"[monte_carlo] unknown MC_BACKEND={MC_BACKEND!r}, using auto")
+    saved = _saved_backend()
+    if saved in NORMAL_BACKENDS:
+        return saved
+    return "native" if "native" in NORMAL_BACKENDS else "numpy"
+
+
+BACKEND = _select_backend()
+
 
-    print(f"[monte_carlo] Running MC: μ={mu:.2f}, σ={sigma:.2f}, threshold={point_threshold}")
-    if _ocaml_mc:
-        # call into OCaml for a pure-C binding
-        prob = _ocaml_mc.monte_carlo(mu, sigma, point_threshold, num_simulations)
-    else:
-        # fallback to Python NumPy version
-        prob = run_monte_carlo_simulation(
-            mu, sigma,
-            point_threshold=point_threshold,
-            num_simulations=num_simulations,
-            distribution=distribution
-        )
-    return prob
+def _simulate_normal_rows(mu, sigma, threshold, num_simulations, rng, memory_budget):
+    return NORMAL_BACKENDS[BACKEND](mu, sigma, threshold, num_simulations, rng, memory_budget)
@@ -0,0 +1,160 @@
+"""
+opponent_splits.py
+──────────────────
+Player × opponent career scoring totals (points sum, games).
+
+Completed seasons never change, so their per-opponent totals are built
+once per player (from the cached game logs), kept in memory and – when
+`GAME_LOG_CACHE_DB` is set – persisted next to the game logs so other
+workers skip the crawl too. Only the current season is re-aggregated,
+straight from the cached current-season log.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from nba_api.stats.endpoints import playercareerstats
+
+from fetch_planner import NBA_STATS, host_slot
+from game_log_cache import get_player_game_log, is_cached
+
+_DB_PATH = os.getenv("GAME_LOG_CACHE_DB")
+_CRAWL_PAUSE = 0.5          # seconds between *uncached* season fetches
+
+_store = {}                 # player_id -> {"built_for", "seasons", "totals"}
+_store_lock = threading.Lock()
+
+
+def totals_by_opponent(games_df):
+    """{opponent_abbr: [points_sum, games]} for one game-log frame."""
+    if games_df is None or games_df.empty:
+        return {}
+    opp = games_df["MATCHUP"].str.extract(r"(?:vs\.|@) (\w+)\s*$", expand=False)
+    grouped = games_df["PTS"].groupby(opp).agg(["sum", "count"])
+    return {abbr: [int(row["sum"]), int(row["count"])] for abbr, row in grouped.iterrows()}
+
+
+############################################################################
+### Persistence (optional)
+############################################################################
+
+def _connect():
+    conn = sqlite3.connect(_DB_PATH, timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS opponent_totals ("
+        " player_id INTEGER PRIMARY KEY, payload TEXT)"
+    )
+    return conn
+
+
+def _load(player_id):
+    if not _DB_PATH:
+        return None
+    try:
+        with _connect() as conn:
+            row = conn.execute(
+                "SELECT payload FROM opponent_totals WHERE player_id=?", (player_id,)
+            ).fetchone()
+    except sqlite3.Error as e:
+        print(f"[opponent_splits] disk read failed for {player_id}: {e}")
+        return None
+    return json.loads(row[0]) if row else None
+
+
+def _save(player_id, record):
+    if not _DB_PATH:
+        return
+    try:
+        with _connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO opponent_totals VALUES (?, ?)",
+                (player_id, json.dumps(record)),
+            )
+    except sqlite3.Error as e:
+        print(f"[opponent_splits] disk write failed for {player_id}: {e}")
+
+
+############################################################################
+### Build / incremental update
+############################################################################
+
+def _historical_record(player_id, current_season):
+    """
+    Totals over every completed season. Rebuilt only when the current
+    season rolls over, and then only the newly completed seasons are read.
+    """
+    with _store_lock:
+        record = _store.get(player_id)
+    if record is None:
+        record = _load(player_id)
+    if record and record["built_for"] == current_season:
+        with _store_lock:
+            _store[player_id] = record
+        return record
+
+    try:
+        with host_slot(NBA_STATS):
+            career_df = playercareerstats.PlayerCareerStats(player_id=player_id).get_data_frames()[0]
+    except Exception:
+        career_df = None
+    if career_df is None or career_df.empty:
+        return {"built_for": current_season, "seasons": [], "totals": {}}
+
+    record = record or {"seasons": [], "totals": {}}
+    done = set(record["seasons"])
+    totals = {abbr: list(v) for abbr, v in record["totals"].items()}
+    complete = True
+
+    for season in career_df["SEASON_ID"].unique():
+        if season == current_season or season in done:
+            continue
+        cold = not is_cached(player_id, season)
+        try:
+            season_log = get_player_game_log(player_id, season)
+        except Exception:
+            complete = False        # retry this season on the next request
+            continue
+        for abbr, (pts, games) in totals_by_opponent(season_log).items():
+            acc = totals.setdefault(abbr, [0, 0])
+            acc[0] += pts
+            acc[1] += games
+        done.add(season)
+        if cold:
+            time.sleep(_CRAWL_PAUSE)
+
+    record = {
+        "built_for": current_season if complete else None,
+        "seasons": sorted(done),
+        "totals": totals,
+    }
+    with _store_lock:
+        _store[player_id] = record
+    _save(player_id, record)
+    return record
+
+
+def career_avg_vs_opponent(player_id, opponent_abbr, current_season, season_log=None):
+    """
+    Career points-per-game against `opponent_abbr`, or None if the player
+    never faced them. `season_log` is the current regular-season frame if
+    the caller already has it.
+    """
+    if not opponent_abbr:
+        return None
+    player_id = int(player_id)
+    record = _historical_record(player_id, current_season)
+    pts, games = record["totals"].get(opponent_abbr, [0, 0])
+
+    if season_log is None:
+        try:
+            season_log = get_player_game_log(player_id, current_season)
+        except Exception:
+            season_log = None
+    cur_pts, cur_games = totals_by_opponent(season_log).get(opponent_abbr, [0, 0])
+
+    pts += cur_pts
+    games += cur_games
+    return float(pts / games) if games else None
@@ -0,0 +1,137 @@
+"""
+parlay_pricing.py
+─────────────────
+Joint pricing for multi-pick slips (every pick is an "over").
+
+Multiplying per-pick probabilities assumes independence, which is wrong
+for teammates and for picks in the same game. Here all legs are simulated
+together from one multivariate normal:
+
+1. Each leg is a player's points ~ N(mcMu, mcSigma), the same model the
+   per-pick Monte Carlo uses, so marginals match the player documents.
+2. Legs on the same team or in the same game get a correlation from the
+   two players' game logs aligned on Game_ID, shrunk toward 0 by the
+   number of shared games. Other pairs are independent.
+3. The correlation matrix is projected to the nearest valid (PSD) one.
+4. One (sims × legs) standard-normal draw answers every slip at once:
+   hits @ slip_matrix.T counts the legs each slip cleared per draw.
+"""
+
+import os
+
+import numpy as np
+from scipy import stats as st
+
+from game_log_cache import get_player_game_log
+
+PARLAY_SIMULATIONS = int(os.getenv("PARLAY_SIMULATIONS", "20000"))
+MIN_SHARED_GAMES = 5            # fewer shared games -> treat as independent
+SHRINKAGE_GAMES = 10            # rho * n / (n + SHRINKAGE_GAMES)
+_CHUNK_CELLS = 2 ** 24          # draws × slips per matmul chunk (~64 MB float32)
+
+
+def _points_by_game(player_id, season):
+    df = get_player_game_log(player_id, season)
+    if df.empty:
+        return None
+    return df.set_index("Game_ID")["PTS"].astype(float)
+
+
+def pair_correlation(a, b):
+    """Shrunk Pearson correlation of two Game_ID-indexed point series."""
+    if a is None or b is None:
+        return 0.0
+    left, right = a.align(b, join="inner")
+    n = len(left)
+    if n < MIN_SHARED_GAMES or left.std() == 0 or right.std() == 0:
+        return 0.0
+    rho = float(np.corrcoef(left.to_numpy(), right.to_numpy())[0, 1])
+    return rho * n / (n + SHRINKAGE_GAMES)
+
+
+def nearest_correlation(c, eps=1e-6):
+    """Clip negative eigenvalues and rescale to a unit diagonal."""
+    c = (c + c.T) / 2
+    vals, vecs = np.linalg.eigh(c)
+    if vals.min() >= eps:
+        return c
+    fixed = (vecs * np.maximum(vals, eps)) @ vecs.T
+    d = np.sqrt(np.diag(fixed))
+    return fixed / np.outer(d, d)
+
+
+def correlation_matrix(legs, season):
+    """
+    Leg × leg correlation. `legs` are dicts with playerId, team, gameId.
+    Only pairs sharing a team or a game are estimated.
+    """
+    n = len(legs)
+    corr = np.eye(n)
+    series = {}
+    for i in range(n):
+        for j in range(i + 1, n):
+            a, b = legs[i], legs[j]
+            if a["playerId"] == b["playerId"]:
+                corr[i, j] = corr[j, i] = 1.0
+                continue
+            related = a.get("team") == b.get("team") or (
+                a.get("gameId") is not None and a.get("gameId") == b.get("gameId")
+            )
+            if not related:
+                continue
+            for leg in (a, b):
+                if leg["playerId"] not in series:
+                    series[leg["playerId"]] = _points_by_game(leg["playerId"], season)
+            corr[i, j] = corr[j, i] = pair_correlation(series[a["playerId"]], series[b["playerId"]])
+    return nearest_correlation(corr)
+
+
+def price_slips(legs, slips, season, num_simulations=PARLAY_SIMULATIONS, seed=None):
+    """
+    Joint probability that every pick of each slip goes over.
+
+    legs:   [{"playerId", "team", "gameId", "threshold", "mcMu", "mcSigma"}, ...]
+    slips:  [[leg index, ...], ...]
+    Returns one {"legs", "probability", "std_err", "independent", "lift"}
+    per slip, in input order; "independent" is the product of marginals.
+    """
+    if not slips:
+        return []
+    mu = np.array([leg["mcMu"] for leg in legs], dtype=float)
+    sigma = np.array([leg["mcSigma"] for leg in legs], dtype=float)
+    threshold = np.array([leg["threshold"] for leg in legs], dtype=float)
+    cut = (threshold - mu) / sigma                      # over <=> z > cut
+    marginal = st.norm.sf(cut)
+
+    membership = np.zeros((len(slips), len(legs)), dtype=np.float32)
+    for s, slip in enumerate(slips):
+        membership[s, list(slip)] = 1.0
+    sizes = membership.sum(axis=1)
+
+    chol = np.linalg.cholesky(correlation_matrix(legs, season))
+    rng = np.random.default_rng(seed)
+    wins = np.zeros(len(slips))
+    chunk = max(1, _CHUNK_CELLS // len(slips))
+    for start in range(0, num_simulations, chunk):
+        rows = min(chunk, num_simulations - start)
+        z = rng.standard_normal((rows, len(legs))) @ chol.T
+        hits = (z > cut).astype(np.float32)
+        wins += ((hits @ membership.T) == sizes).sum(axis=0)
+
+    p = wins / num_simulations
+    out = []
+    for s, slip in enumerate(slips):
+        independent = float(np.prod(marginal[list(slip)]))
+        out.append({
+            "legs": list(slip),
+            "probability": float(p[s]),
+            "std_err": float(np.sqrt(p[s] * (1 - p[s]) / num_simulations)),
+            "independent": independent,
+            "lift": float(p[s] / independent) if independent else None,
+        })
+    return out
+
+
+def rank_slips(legs, slips, season, **kwargs):
+    """price_slips() sorted by joint probability, best first."""
+    return sorted(price_slips(legs, slips, season, **kwargs), key=lambda r: -r["probability"])
@@ -1,14 +1,18 @@
 import requests
 import datetime
-import pytz
-import time
+import numpy as np
 import pandas as pd
-from nba_api.stats.endpoints import leaguestandings
-from nba_api.stats.static import teams, players
-from nba_api.stats.endpoints import ScoreboardV2 as Scoreboard
-from nba_api.stats.endpoints import playercareerstats, playergamelog
-from nba_api.stats.endpoints import PlayerGameLog
+from nba_api.stats.static import players
+from nba_api.stats.endpoints import TeamGameLog
 from typing import Dict, Tuple, Union, Optional
+from game_log_cache import get_player_game_log
+from opponent_splits import career_avg_vs_opponent
+import schedule_index
+import standings_snapshot
+import team_registry
+import season_aggregates
+from game_log_frames import annotate, game_rows
+from fetch_planner import BALLDONTLIE, NBA_STATS, FetchTask, host_slot, run_plan
 
 
 
@@ -45,19 +49,11 @@ def deduce_game_type(game_id):
 
 
 def get_team_full_name_from_abbr(abbr):
-        all_teams = teams.get_teams()
-        for t in all_teams:
-            if t["abbreviation"] == abbr:
-                return t["full_name"]
-        return abbr
+    return team_registry.full_name_from_abbr(abbr)
 
 
 def get_team_id_from_abbr(abbr):
-    all_teams = teams.get_teams()
-    for t in all_teams:
-        if t["abbreviation"] == abbr:
-            return t["id"]
-    return None
+    return team_registry.id_from_abbr(abbr)
 
 
 def get_current_season():
@@ -75,49 +71,9 @@ def fetch_more_games(player_id):
     """
     Fetch more games for a player, up to max_games
     """
-
-    more_regular_games = []
-    pgl = PlayerGameLog(
-            player_id=player_id,                 
-            season=get_current_season(),
-            season_type_all_star='Regular Season'
-        )
-    games_df = pgl.get_data_frames()[0]
-    for i in range(5, len(games_df)):
-        curr = games_df.iloc[i]
-        matchup = curr['MATCHUP']            
-        if ' vs. ' in matchup:
-            location = 'Home'
-            opp_abbr = matchup.split(' vs. ')[1]
-        elif ' @ ' in matchup:
-            location = 'Away'
-            opp_abbr = matchup.split(' @ ')[1]
-        else:
-            location = 'Unknown'
-            opp_abbr = None
-        # lookup full name & logo
-        opp_full = get_team_full_name_from_abbr(opp_abbr) if opp_abbr else None
-        opp_id   = get_team_id_from_abbr(opp_abbr)        if opp_abbr else None
-        opp_logo = get_team_logo_url(opp_id)              if opp_id   else None
-        # minutes (takes only the minute portion if it's "MM:SS")
-        raw_min = curr.get('MIN', '')
-        if isinstance(raw_min, str) and ':' in raw_min:
-            minutes = int(raw_min.split(':')[0])
-        else:
-            minutes = int(raw_min) if raw_min else 0
-        
-        more_regular_games.append({
-            "date":             curr['GAME_DATE'],
-            "points":           int(curr['PTS']),
-            "opponent":         opp_abbr,
-            "opponentFullName": opp_full,
-            "opponentLogo":     opp_logo,
-            "location":         location,
-            "minutes":          minutes,
-            "gameType":         "Regular Season"
-        })
-
-    return more_regular_games
+    games_df = get_player_game_log(player_id, get_current_season(), 'Regular Season')
+    more = annotate(games_df.iloc[5:])
+    return game_rows(more, "Regular Season", include_game_id=False)
     
 
 def fetch_all_opponent_games(player_id, opponent_abbr):
@@ -130,106 +86,51 @@ def fetch_all_opponent_games(player_id, opponent_abbr):
     """
     # 1) pull full regular-season game log
     season_str = get_current_season()
-    pgl = PlayerGameLog(
-        player_id=player_id,
-        season=season_str,
-        season_type_all_star='Regular Season'
-    )
-    df = pgl.get_data_frames()[0]
+    if not opponent_abbr:
+        return []
+    df = get_player_game_log(player_id, season_str, 'Regular Season')
     if df.empty:
         return []
 
-    games = []
-    for _, row in df.iterrows():
-        # only keep games vs. this opponent
-        matchup = row.get('MATCHUP', '')
-        if opponent_abbr not in matchup:
-            continue
-
-        # determine home/away and raw abbr
-        if ' vs. ' in matchup:
-            location = 'Home'
-            opp = matchup.split(' vs. ')[1]
-        elif ' @ ' in matchup:
-            location = 'Away'
-            opp = matchup.split(' @ ')[1]
-        else:
-            location = 'Unknown'
-            opp = None
-
-        # minutes parsing
-        raw_min = row.get('MIN', '')
-        if isinstance(raw_min, str) and ':' in raw_min:
-            minutes = int(raw_min.split(':')[0])
-        else:
-            minutes = int(raw_min) if raw_min else 0
-
-        # lookup full name & logo
-        opp_full = get_team_full_name_from_abbr(opp) if opp else None
-        opp_id   = get_team_id_from_abbr(opp)        if opp else None
-        opp_logo = get_team_logo_url(opp_id)         if opp_id else None
-
-
-        games.append({
-            "gameId":           row['Game_ID'],
-            "date":             row['GAME_DATE'],
-            "points":           int(row['PTS']),
-            "opponent":         opp,
-            "opponentFullName": opp_full,
-            "opponentLogo":     opp_logo,
-            "location":         location,
-            "minutes":          minutes,
-            "gameType":         "Regular Season"
-        })
-
-    return games
+    games = annotate(df)
+    return game_rows(games[games["OPP_ABBR"] == opponent_abbr], "Regular Season")
    
 
+# output key -> PlayerGameLog column
+_ADVANCED_LOG_FIELDS = {
+    "points": "PTS",
+    "fgm": "FGM",
+    "fga": "FGA",
+    "3pm": "FG3M",
+    "3pa": "FG3A",
+    "ftm": "FTM",
+    "fta": "FTA",
+    "turnovers": "TOV",
+    "minutes": "MIN",
+}
+
+
 def fetch_player_game_logs(nba_player_id, season_str):
     """
     Fetches advanced game logs for the specified NBA player (by official nba_api ID).
     Returns per-game stats including FGM, FGA, 3PA, 3PM, etc.
     """
     try:
-        gamelog_df = playergamelog.PlayerGameLog(player_id=nba_player_id, season=season_str).get_data_frames()[0]
+        gamelog_df = get_player_game_log(nba_player_id, season_str)
     except Exception as e:
         print(f"[fetch_player_game_logs] Error fetching logs for {nba_player_id}, season {season_str}: {e}")
         return []
     if gamelog_df.empty:
         return []
-    game_dicts = []
-    for idx, row in gamelog_df.iterrows():
-        fgm = row.get("FGM", 0)
-        fga = row.get("FGA", 0)
-        fg3m = row.get("FG3M", 0)
-        fg3a = row.get("FG3A", 0)
-        ftm = row.get("FTM", 0)
-        fta = row.get("FTA", 0)
-        tov = row.get("TOV", 0)
-        pts = row.get("PTS", 0)
-        minutes = row.get("MIN", 0)
-        matchup_str = row.get("MATCHUP", "")
-        if "vs." in matchup_str:
-            home_away_flag = 1
-        elif "@" in matchup_str:
-            home_away_flag = 0
-        else:
-            home_away_flag = None
-        team_possessions = None  # Not provided in standard boxscores
-        game_dicts.append({
-            "points": pts,
-            "fgm": fgm,
-            "fga": fga,
-            "3pm": fg3m,
-            "3pa": fg3a,
-            "ftm": ftm,
-            "fta": fta,
-            "turnovers": tov,
-            "minutes": minutes,
-            "home_away_flag": home_away_flag,
-            "team_possessions": team_possessions
-        })
-    return game_dicts
+    games = gamelog_df.reindex(columns=list(_ADVANCED_LOG_FIELDS.values()), fill_value=0)
+    games.columns = list(_ADVANCED_LOG_FIELDS.keys())
+    matchup = gamelog_df["MATCHUP"].fillna("")
+    flags = np.select([matchup.str.contains("vs.", regex=False), matchup.str.contains("@", regex=False)],
+                      [1, 0], default=-1)
+    flags = pd.Series(flags, index=games.index).astype(object)
+    games["home_away_flag"] = flags.where(flags >= 0, None)
+    games["team_possessions"] = None  # Not provided in standard boxscores
+    return games.astype(object).to_dict("records")
 
 
 def _safe_div(num: float, den: float) -> Optional[float]:
@@ -257,93 +158,154 @@ def analyze_player_performance(
         shot_dist_3pt, ft_rate, efg, usage_rate
     """
 
-    logs = fetch_player_game_logs(nba_player_id, season_str)
-    if not logs:
+    try:
+        gamelog_df = get_player_game_log(nba_player_id, season_str)
+    except Exception as e:
+        print(f"[analyze_player_performance] Error fetching logs for {nba_player_id}, season {season_str}: {e}")
+        return {}
+    if gamelog_df.empty:
         print(f"[analyze_player_performance] No logs for ID={nba_player_id}, season={season_str}")
         return {}
 
-    # ── accumulate raw totals ───────────────────────────────────────────────────
-    totals = dict(
-        fga=0, fgm=0,
-        pa3=0, pm3=0,
-        fta=0, ftm=0,
-        tov=0, poss=0,
-        points=0,
-    )
+    return performance_from_summary(season_aggregates.summarize(annotate(gamelog_df)))
+
 
-    for g in logs:
-
-        fga  = g.get("fga", 0)
-        fgm  = g.get("fgm", 0)
-        pa3  = g.get("3pa", 0)
-        pm3  = g.get("3pm", 0)
-        fta  = g.get("fta", 0)
-        ftm  = g.get("ftm", 0)
-        tov  = g.get("turnovers", 0)
-        poss = g.get("team_possessions") or 0
-        points  = g.get("points", 0)
-
-        totals["fga"]  += fga
-        totals["fgm"]  += fgm
-        totals["pa3"]  += pa3
-        totals["pm3"]  += pm3
-        totals["fta"]  += fta
-        totals["ftm"]  += ftm
-        totals["tov"]  += tov
-        totals['points'] += points
-
-    G     = len(logs)
-    FGA   = totals["fga"]
-    FTA   = totals["fta"]
-
-    # ── advanced rates ──────────────────────────────────────────────────────────
-    efg          = _safe_div(totals["fgm"] + 0.5 * totals["pm3"], FGA)
-    shot_dist_3p = _safe_div(totals["pa3"], FGA)
-    ft_rate      = _safe_div(FTA, FGA)
-    # optional: True Shooting % (not returned in tuple to avoid breaking order)
-    ts_pct       = _safe_div(totals["points"], 2 * (FGA + 0.44 * FTA))
-
-    # ── per-game averages ───────────────────────────────────────────────────────
-    per_game = lambda x: _safe_div(x, G)
-
-    results_dict = {
-        "avg_fga": per_game(totals["fga"]),
-        "avg_fgm": per_game(totals["fgm"]),
-        "avg_3pa": per_game(totals["pa3"]),
-        "avg_3pm": per_game(totals["pm3"]),
-        "avg_fta": per_game(totals["fta"]),
-        "avg_ftm": per_game(totals["ftm"]),
-        "avg_tov": per_game(totals["tov"]),
-        "shot_dist_3pt": shot_dist_3p,
-        "ft_rate": ft_rate,
-        "efg": efg,
+def performance_from_summary(summary):
+    """Shooting / usage inputs out of a season_aggregates.summarize() result."""
+    if not summary["games"]:
+        return {key: None for key in _PERFORMANCE_KEYS}
+    return {
+        "avg_fga": summary["all_fga_avg"],
+        "avg_fgm": summary["all_fgm_avg"],
+        "avg_3pa": summary["all_pa3_avg"],
+        "avg_3pm": summary["all_pm3_avg"],
+        "avg_fta": summary["all_fta_avg"],
+        "avg_ftm": summary["all_ftm_avg"],
+        "avg_tov": summary["all_tov_avg"],
+        "shot_dist_3pt": summary["shot_dist_3pt"],
+        "ft_rate": summary["ft_rate"],
+        "efg": summary["efg"],
         # extras you might want later
-        "ts_pct": ts_pct,
-        "games": G
+        "ts_pct": summary["ts_pct"],
+        "games": summary["games"]
     }
 
-    return results_dict
+
+_PERFORMANCE_KEYS = (
+    "avg_fga", "avg_fgm", "avg_3pa", "avg_3pm", "avg_fta", "avg_ftm", "avg_tov",
+    "shot_dist_3pt", "ft_rate", "efg", "ts_pct", "games",
+)
  
 
-def analyze_player(first_name, last_name, threshold=None):
-    """
-    1) Use balldontlie just for the player's name confirmation.
-    2) Then obtain the official NBA ID via players.find_players_by_full_name.
-    3) Retrieve logs and team info from nba_api.
-    4) Return a data object with original fields (name, photoUrl, teamLogo, opponentLogo, etc.)
-       plus advanced metrics and career season stats.
-    """
-    # (A) Use balldontlie to check for player's existence (but ignore its ID)
+def fetch_balldontlie_player(first_name, last_name):
+    """First balldontlie match for the name, or {"error": ...}."""
     url = "https://api.balldontlie.io/v1/players"
     headers = {"Authorization": "03f64803-21d9-40e4-ab9f-5d69ca82c8dc"}
     params = {"first_name": first_name, "last_name": last_name}
-    response = requests.get(url, headers=headers, params=params)
+    with host_slot(BALLDONTLIE):
+        response = requests.get(url, headers=headers, params=params)
     if response.status_code != 200:
         return {"error": f"API Error from balldontlie: {response.status_code}"}
     bd_players = response.json().get("data", [])
     if not bd_players:
         return {"error": f"No players found in balldontlie for {first_name} {last_name}"}
-    bdl_player = bd_players[0]
+    return bd_players[0]
+
+
+def find_next_game(team_id, max_search_days=14):
+    """
+    Next game for `team_id` from the shared schedule index.
+    Returns a dict with game_id, game_date (MM/DD/YYYY), game_time,
+    home (True/False, None if nothing found) and opponent_team_id.
+    """
+    next_game = schedule_index.next_game(team_id, max_search_days)
+    if next_game is None:
+        return {
+            "game_id": None,
+            "game_date": None,
+            "game_time": None,
+            "home": None,
+            "opponent_team_id": None,
+        }
+    return next_game
+
+
+def fetch_season_log(nba_player_id, season_str):
+    """Regular-season log, or an empty frame if nba_api fails."""
+    try:
+        return get_player_game_log(nba_player_id, season_str)
+    except Exception:
+        return pd.DataFrame()
+
+
+def fetch_team_stats_for_usage(team_id, season):
+    """
+    Fetches per‐game averages for every team, then adds an 'AVG_POSS' column.
+    """
+    with host_slot(NBA_STATS):
+        gamelog_df = TeamGameLog(team_id=team_id, season=season).get_data_frames()[0]
+    return (
+        float(gamelog_df['FGA'].mean()),
+        float(gamelog_df['FTA'].mean()),
+        float(gamelog_df['TOV'].mean())
+    )
+
+
+def analyze_player(first_name, last_name, threshold=None):
+    """
+    Full analysis for one prop: profile_player() plus the fields that
+    depend on the line (see with_threshold()).
+    """
+    profile = profile_player(first_name, last_name)
+    if "error" in profile:
+        return profile
+    return with_threshold(profile, threshold)
+
+
+def with_threshold(profile, threshold):
+    """
+    Player document for `threshold` from a profile_player() result.
+    Only the under-counts depend on the line; each is a binary search on
+    the sorted points the profile carries.
+    """
+    pdata = {k: v for k, v in profile.items() if not k.startswith("_")}
+    pdata["threshold"] = threshold
+    season_points = profile.get("_season_points")
+    playoff_points = profile.get("_playoff_points")
+    pdata["underCount"] = (
+        season_aggregates.under_count(season_points, threshold)
+        if threshold is not None and season_points is not None and len(season_points) else None
+    )
+    pdata["playoff_underCount"] = (
+        season_aggregates.under_count(playoff_points, threshold)
+        if threshold is not None and playoff_points is not None else None
+    )
+    return pdata
+
+
+def profile_player(first_name, last_name):
+    """
+    1) Use balldontlie just for the player's name confirmation.
+    2) Then obtain the official NBA ID via players.find_players_by_full_name.
+    3) Retrieve logs and team info from nba_api.
+    4) Return a data object with original fields (name, photoUrl, teamLogo, opponentLogo, etc.)
+       plus advanced metrics and career season stats.
+
+    Nothing here depends on the prop line. The sorted season / playoff
+    points ride along under "_season_points" / "_playoff_points" so
+    with_threshold() can derive the under-counts for any line.
+    """
+    current_season_str = get_current_season()
+
+    # (A) balldontlie (name confirmation) and standings don't depend on each other
+    first_wave = run_plan({
+        "bdl":       FetchTask(lambda: fetch_balldontlie_player(first_name, last_name)),
+        "standings": FetchTask(standings_snapshot.snapshot),
+    })
+    bdl_player = first_wave["bdl"]
+    if "error" in bdl_player:
+        return bdl_player
+    standings = first_wave["standings"]
     
     # (B) Get the official NBA ID using nba_api
     full_name = f"{bdl_player['first_name']} {bdl_player['last_name']}"
@@ -359,82 +321,68 @@ def analyze_player(first_name, last_name, threshold=None):
     player_position = bdl_player.get("position", "N/A")
     player_team = bdl_player["team"]["full_name"] if bdl_player.get("team") else "Unknown Team"
     player_team_conference = bdl_player["team"].get("conference", "Unknown")
-    standings = leaguestandings.LeagueStandings().get_data_frames()[0]
-    standings["TeamID"] = standings["TeamID"].astype(int)
-    player_team_standings = teams.find_teams_by_full_name(player_team)[0]
-    player_team_id = player_team_standings["id"]
-    player_team_standings = standings[standings["TeamID"] == player_team_id]
+    player_team_info = team_registry.lookup(player_team)
+    if player_team_info is None:
+        return {"error": f"Unknown team {player_team} for {full_name}"}
+    player_team_id = player_team_info["id"]
     player_team_logo = get_team_logo_url(player_team_id)
-    player_team_playoffRank = int(player_team_standings["PlayoffRank"].values[0])
-    
-    # Find upcoming game (using Scoreboard)
-    max_search_days = 14
-    eastern = pytz.timezone('America/New_York')
-    today_eastern = datetime.datetime.now(eastern).date()
-    search_date = today_eastern
-    game_date_str = None
-    game_date_est = None
-    opponent_team_name = None
+    player_team_playoffRank = standings[player_team_id]["PlayoffRank"]
+
+    # (D) With both IDs known, everything else fans out; only the playoff log
+    #     and the opponent splits wait for the schedule lookup.
+    def opponent_abbr_of(next_game):
+        opp = team_registry.BY_ID.get(next_game["opponent_team_id"])
+        return opp["abbreviation"] if opp else None
+
+    def playoff_log(next_game):
+        if not next_game["game_id"]:
+            return None         # no game within the search window
+        if deduce_game_type(next_game["game_id"]) != "Playoffs":
+            return None
+        return get_player_game_log(nba_player_id, current_season_str, 'Playoffs')
+
+    fetched = run_plan({
+        "next_game":   FetchTask(lambda: find_next_game(player_team_id)),
+        "season_log":  FetchTask(lambda: fetch_season_log(nba_player_id, current_season_str)),
+        "team_usage":  FetchTask(lambda: fetch_team_stats_for_usage(player_team_id, current_season_str)),
+        "playoff_log": FetchTask(playoff_log, deps=("next_game",)),
+        "career_vs_opp": FetchTask(
+            lambda ng, log: career_avg_vs_opponent(
+                nba_player_id, opponent_abbr_of(ng), current_season_str,
+                season_log=log if not log.empty else None,
+            ),
+            deps=("next_game", "season_log"),
+        ),
+        "opp_games":   FetchTask(lambda ng: fetch_all_opponent_games(nba_player_id, opponent_abbr_of(ng)),
+                                 deps=("next_game",)),
+    })
+
+    next_game = fetched["next_game"]
+    opponent_team_id = next_game["opponent_team_id"]
+    game_date_str = next_game["game_date"]
+    game_date_est = next_game["game_time"]
+    home = next_game["home"]
+    home_game = home is not False
+    next_game_id = next_game["game_id"]
+    next_game_type = deduce_game_type(next_game_id) if next_game_id else None
     opponent_team_conference = None
     opponent_team_playoffRank = None
-    opponent_team_logo = None
-    home = None
-    next_game_id = None
-    home_game = True
-    for _ in range(max_search_days):
-        game_date_str = search_date.strftime("%m/%d/%Y")
-        try:
-            scoreboard = Scoreboard(game_date=game_date_str, league_id='00')
-            game_df = scoreboard.game_header.get_data_frame()
-        except Exception:
-            search_date += datetime.timedelta(days=1)
-            continue
-        if not game_df.empty:
-            if player_team_id in game_df['HOME_TEAM_ID'].values:
-                home_index = int(game_df.index[game_df['HOME_TEAM_ID'] == player_team_id][0])
-                opponent_team_id = game_df.at[home_index, 'VISITOR_TEAM_ID']
-                game_date_est = game_df.at[home_index, 'GAME_STATUS_TEXT']
-                home = True
-                next_game_id = game_df.at[home_index, 'GAME_ID']
-                next_game_type = deduce_game_type(next_game_id) if next_game_id else None
-                break
-            elif player_team_id in game_df['VISITOR_TEAM_ID'].values:
-                home_game = False
-                away_index = int(game_df.index[game_df['VISITOR_TEAM_ID'] == player_team_id][0])
-                opponent_team_id = game_df.at[away_index, 'HOME_TEAM_ID']
-                game_date_est = game_df.at[away_index, 'GAME_STATUS_TEXT']
-                home = False
-                next_game_id = game_df.at[away_index, 'GAME_ID']
-                next_game_type = deduce_game_type(next_game_id) if next_game_id else None
-                break
-        search_date += datetime.timedelta(days=1)
-    all_teams = teams.get_teams()
-    opponent_team = next((t for t in all_teams if t["id"] == opponent_team_id), None)
+
+    opponent_team = team_registry.BY_ID.get(opponent_team_id)
     opponent_team_name = opponent_team["full_name"] if opponent_team else "Unknown Opponent"
     opponent_team_logo = get_team_logo_url(opponent_team_id) if opponent_team else "/placeholder.svg?height=40&width=40"
     matchup = f"{opponent_team_name} at {player_team}" if home else f"{player_team} at {opponent_team_name}"
-    opponent_team_standings = standings[standings["TeamID"] == opponent_team_id] if opponent_team_id else None
-    if opponent_team_standings is not None and not opponent_team_standings.empty:
-        opponent_team_conference = opponent_team_standings["Conference"].values[0]
-        opponent_team_playoffRank = int(opponent_team_standings["PlayoffRank"].values[0])
+    opponent_team_standings = standings.get(opponent_team_id) if opponent_team_id else None
+    if opponent_team_standings is not None:
+        opponent_team_conference = opponent_team_standings["Conference"]
+        opponent_team_playoffRank = opponent_team_standings["PlayoffRank"]
     
     # Get player image URL from official NBA ID
     player_image_url = get_player_image_url(nba_player_id)
 
-    current_season_str = get_current_season()
-
-
-    # Career stats from playercareerstats
-    try:
-        career_df = playercareerstats.PlayerCareerStats(player_id=nba_player_id).get_data_frames()[0]
-    except Exception:
-        career_df = None
 
     # Current season stats
-    try:
-        season_log = playergamelog.PlayerGameLog(player_id=nba_player_id, season=current_season_str).get_data_frames()[0]
-    except Exception:
-        season_log = pd.DataFrame()
+    season_log = fetched["season_log"]
     if not season_log.empty:
         season_avg_points = float(season_log['PTS'].mean())
     else:
@@ -454,57 +402,21 @@ def analyze_player(first_name, last_name, threshold=None):
                 season_avg_points_vs_opponent = None
         else:
             season_avg_points_vs_opponent = None
-        career_points_list = []
-        career_games_list = []
-        if career_df is not None and not career_df.empty:
-            seasons = career_df["SEASON_ID"].unique()
-            for season in seasons:
-                try:
-                    season_game_log = playergamelog.PlayerGameLog(player_id=nba_player_id, season=season).get_data_frames()[0]
-                except Exception:
-                    continue
-                if season_game_log.empty:
-                    continue
-                games_vs_opponent = season_game_log[season_game_log["MATCHUP"].str.contains(opponent_abbr)]
-                if not games_vs_opponent.empty:
-                    total_points = games_vs_opponent["PTS"].sum()
-                    games_played = games_vs_opponent.shape[0]
-                    career_points_list.append(total_points)
-                    career_games_list.append(games_played)
-                time.sleep(0.5)
-            if career_games_list:
-                career_avg_points_vs_opponent = float(sum(career_points_list) / sum(career_games_list))
-            else:
-                career_avg_points_vs_opponent = None
-        else:
-            career_avg_points_vs_opponent = None
+        career_avg_points_vs_opponent = fetched["career_vs_opp"]
 
     # Check if Playoff Game First
     num_playoff_games = 0
     playoff_games = []
-    playoff_avg = 0
-    playoff_minutes_avg = 0
-    playoff_underCount = 0
-    playoff_points_home_avg = 0
-    playoff_home_games = 0
-    playoff_points_away_avg = 0
-    playoff_minutes_home_avg = 0
-    playoff_minutes_away_avg = 0
-    playoff_away_games = 0
     playoff_curr_score = ""
+    round_playoff_game = 0
+    type_playoff_game = ['Conference First Round', 'Conference Semifinals', 'Conference Finals', 'NBA Finals']
+    playoff_summary = None
 
     if next_game_type == "Playoffs":
-        pgl = PlayerGameLog(
-            player_id=nba_player_id,                 
-            season=get_current_season(),
-            season_type_all_star='Playoffs'
-        )
-        games_df = pgl.get_data_frames()[0]  # most recent game is first row
+        games_df = fetched["playoff_log"]  # most recent game is first row
         num_playoff_games = len(games_df)
         game = 1
-        round_playoff_game = 0
         series_score = "0-0"
-        type_playoff_game = ['Conference First Round', 'Conference Semifinals', 'Conference Finals', 'NBA Finals']
 
         # Get all playoff games data
 
@@ -516,80 +428,29 @@ def analyze_player(first_name, last_name, threshold=None):
         #)
         #series_df = cps.get_data_frames()[0][['GAME_ID', 'SERIES_ID', 'GAME_NUM']]
         
-        for i in range(num_playoff_games):
-            curr = games_df.iloc[num_playoff_games - 1 - i]
-
-            matchup = curr['MATCHUP']            
-            if ' vs. ' in matchup:
-                location = 'Home'
-                opp_abbr = matchup.split(' vs. ')[1]
-                playoff_home_games += 1
-            elif ' @ ' in matchup:
-                location = 'Away'
-                opp_abbr = matchup.split(' @ ')[1]
-                playoff_away_games += 1
-
-            else:
-                location = 'Unknown'
-                opp_abbr = None
-
-            # lookup full name & logo
-            opp_full = get_team_full_name_from_abbr(opp_abbr) if opp_abbr else None
-            opp_id   = get_team_id_from_abbr(opp_abbr)        if opp_abbr else None
-            opp_logo = get_team_logo_url(opp_id)              if opp_id   else None
-
-            # minutes (takes only the minute portion if it's "MM:SS")
-            raw_min = curr.get('MIN', '')
-            if isinstance(raw_min, str) and ':' in raw_min:
-                minutes = int(raw_min.split(':')[0])
-            else:
-                minutes = int(raw_min) if raw_min else 0
-
-            playoff_minutes_avg += minutes
+        playoff_log_df = annotate(games_df)
+        playoff_summary = season_aggregates.summarize(playoff_log_df)
 
-            if int(curr['PTS']) <= threshold:
-                playoff_underCount += 1
-
-            if location == 'Home':
-                playoff_points_home_avg += int(curr['PTS'])
-                playoff_minutes_home_avg += minutes
-            elif location == 'Away':
-                playoff_points_away_avg += int(curr['PTS'])
-                playoff_minutes_away_avg += minutes
-            
-            if game > 7 or (playoff_games and opp_abbr != playoff_games[-1]['opponent']):
+        # oldest game first, so the series bookkeeping can run forward
+        oldest_first = playoff_log_df.iloc[::-1]
+        for curr, result in zip(game_rows(oldest_first, "Playoffs"), oldest_first["WL"]):
+            if game > 7 or (playoff_games and curr["opponent"] != playoff_games[-1]['opponent']):
                 game = 1
                 round_playoff_game += 1
                 series_score = "0-0"
-            if  curr['WL'] == 'W':
-                series_score = f"{int(series_score.split('-')[0]) + 1}-{series_score.split('-')[1]}"
-            else:
-                series_score = f"{series_score.split('-')[0]}-{int(series_score.split('-')[1]) + 1}"
+            wins, losses = (int(x) for x in series_score.split('-'))
+            series_score = f"{wins + 1}-{losses}" if result == 'W' else f"{wins}-{losses + 1}"
 
             playoff_games.append({
-                "gameId":           curr['Game_ID'],
-                "date":             curr['GAME_DATE'],
-                "points":           int(curr['PTS']),
-                "opponent":         opp_abbr,
-                "opponentFullName": opp_full,
-                "opponentLogo":     opp_logo,
-                "location":         location,
-                "minutes":          minutes,
+                **curr,
                 "game_number":      game,
-                "round":            type_playoff_game[round_playoff_game],
+                "round":            type_playoff_game[min(round_playoff_game, len(type_playoff_game) - 1)],
                 "series_score": series_score,
-                "result":         curr['WL'],
+                "result":         result,
                 "gameType":         "Playoffs"
             })
             game += 1
-        
-        
-        playoff_avg = games_df['PTS'].sum() / len(games_df)
-        playoff_minutes_avg /= num_playoff_games if num_playoff_games > 0 else 0
-        playoff_points_home_avg /= playoff_home_games if playoff_home_games > 0 else 0
-        playoff_points_away_avg /= playoff_away_games if playoff_away_games > 0 else 0
-        playoff_minutes_home_avg /= playoff_home_games if playoff_home_games > 0 else 0
-        playoff_minutes_away_avg /= playoff_away_games if playoff_away_games > 0 else 0
+        round_playoff_game = min(round_playoff_game, len(type_playoff_game) - 1)
     
     if playoff_games:
         last_game = playoff_games[-1]           # most-recent playoff game on record
@@ -614,169 +475,39 @@ def analyze_player(first_name, last_name, threshold=None):
 
 
 
-    # Get the last 5 games
-    last_5_regular_games = []
-    last_5_regular_games_avg = 0
-    underCount = 0
-    num_season_count = 5
-    average_mins = 0
-
-    # Check for (if remaining) Regular Season Game
-    pgl = PlayerGameLog(
-            player_id=nba_player_id,                 
-            season=get_current_season(),
-            season_type_all_star='Regular Season'
-        )
-    games_df = pgl.get_data_frames()[0]
-    
-    for i in range(5):
-        curr = games_df.iloc[i]
-        matchup = curr['MATCHUP']            
-        if ' vs. ' in matchup:
-            location = 'Home'
-            opp_abbr = matchup.split(' vs. ')[1]
-        elif ' @ ' in matchup:
-            location = 'Away'
-            opp_abbr = matchup.split(' @ ')[1]
-        else:
-            location = 'Unknown'
-            opp_abbr = None
-        # lookup full name & logo
-        opp_full = get_team_full_name_from_abbr(opp_abbr) if opp_abbr else None
-        opp_id   = get_team_id_from_abbr(opp_abbr)        if opp_abbr else None
-        opp_logo = get_team_logo_url(opp_id)              if opp_id   else None
-        # minutes (takes only the minute portion if it's "MM:SS")
-        raw_min = curr.get('MIN', '')
-        if isinstance(raw_min, str) and ':' in raw_min:
-            minutes = int(raw_min.split(':')[0])
-        else:
-            minutes = int(raw_min) if raw_min else 0
-        last_5_regular_games_avg += int(curr['PTS'])
-
-        if int(curr['PTS']) <= threshold:
-                underCount += 1
-        
-        average_mins += minutes
-        
-        last_5_regular_games.append({
-            "gameId":           curr['Game_ID'],
-            "date":             curr['GAME_DATE'],
-            "points":           int(curr['PTS']),
-            "opponent":         opp_abbr,
-            "opponentFullName": opp_full,
-            "opponentLogo":     opp_logo,
-            "location":         location,
-            "minutes":          minutes,
-            "gameType":         "Regular Season"
-        })
-    
-    last_5_regular_games_avg /= 5
-
-    home_games = 0
-    away_games = 0
-    points_home_avg = 0
-    points_away_avg = 0
-    minutes_home_avg = 0
-    minutes_away_avg = 0
-
-    pgl = PlayerGameLog(
-            player_id=nba_player_id,                 
-            season=get_current_season(),
-            season_type_all_star='Regular Season'
-        )
-    games_df = pgl.get_data_frames()[0]
-    for i in range(5, len(games_df)):
-        curr = games_df.iloc[i]
-        matchup = curr['MATCHUP']            
-        if ' vs. ' in matchup:
-            location = 'Home'
-        elif ' @ ' in matchup:
-            location = 'Away'
-        
-        num_season_count += 1
-
-        # minutes (takes only the minute portion if it's "MM:SS")
-        raw_min = curr.get('MIN', '')
-        if isinstance(raw_min, str) and ':' in raw_min:
-            minutes = int(raw_min.split(':')[0])
-        else:
-            minutes = int(raw_min) if raw_min else 0
+    # Every regular-season split (all / home / away / last 5) in one pass
+    season_games = annotate(season_log)
+    season_summary = season_aggregates.summarize(season_games)
+    last_5_regular_games = game_rows(season_games.iloc[:5], "Regular Season")
+    last_5_regular_games_avg = season_summary["recent_points_avg"]
 
-        if location == 'Home':
-            if curr['PTS'] is None:
-                continue
-            else:
-                points_home_avg += int(curr['PTS'])
-            if minutes is None:
-                continue
-            else:
-                minutes_home_avg += minutes
-            home_games += 1
-        elif location == 'Away':
-            if curr['PTS'] is None:
-                continue
-            else:
-                points_away_avg += int(curr['PTS'])
-            if minutes is None:
-                continue
-            else:
-                minutes_away_avg += minutes
-            away_games += 1
-        
+    num_season_count = season_summary["games"]
+    points_home_avg = season_summary["home_points_avg"]
+    points_away_avg = season_summary["away_points_avg"]
+    minutes_home_avg = season_summary["home_minutes_avg"]
+    minutes_away_avg = season_summary["away_minutes_avg"]
+    average_mins = season_summary["all_minutes_avg"]
 
-        average_mins += minutes
-
-        if int(curr['PTS']) <= threshold:
-            underCount += 1
-
-    
-    average_mins /= num_season_count
-    playoff_minutes_avg /= num_playoff_games if num_playoff_games > 0 else 0
-    points_home_avg /= playoff_home_games if playoff_home_games > 0 else 0
-    points_away_avg /= playoff_away_games if playoff_away_games > 0 else 0
-    minutes_home_avg /= playoff_home_games if playoff_home_games > 0 else 0
-    minutes_away_avg /= playoff_away_games if playoff_away_games > 0 else 0
-
-
-    player_performace_dict = analyze_player_performance(nba_player_id, current_season_str)
-    if not player_performace_dict:
-        player_performace_dict['avg_fga'] = None
-        player_performace_dict['avg_fgm'] = None
-        player_performace_dict['avg_fpa'] = None
-        player_performace_dict['avg_3pm'] = None
-        player_performace_dict['avg_fta'] = None
-        player_performace_dict['avg_ftm'] = None
-        player_performace_dict['avg_tov'] = None
-        player_performace_dict['shot_dist_3pt'] = None
-        player_performace_dict['ft_rate'] = None
-        player_performace_dict['efg'] = None
-        player_performace_dict['ts_pct'] = None
+    player_performace_dict = performance_from_summary(season_summary)
 
     # Get Team Data Metrics To Calculate Usage Rate
-    from nba_api.stats.endpoints import TeamGameLog
-    def fetch_team_stats_for_usage(team_id, season):
-        """
-        Fetches per‐game averages for every team, then adds an 'AVG_POSS' column.
-        """
-        gamelog_df = TeamGameLog(team_id=team_id, season=season).get_data_frames()[0]
-        return (
-            float(gamelog_df['FGA'].mean()),
-            float(gamelog_df['FTA'].mean()),
-            float(gamelog_df['TOV'].mean())
-        )
-        
-
-    team_fga, team_fta, team_tov = fetch_team_stats_for_usage(player_team_id, get_current_season())
+    team_fga, team_fta, team_tov = fetched["team_usage"]
 
     # ── importance metrics ───────────────────────────────────────────────────
     alpha = 0.7
-    usage_rate = (
-        (player_performace_dict['avg_fga'] + 0.475*player_performace_dict['avg_fta'] + player_performace_dict['avg_tov']) * 240
-        / (average_mins * (team_fga + 0.475*team_fta + team_tov))
-    )
-
+    usage_inputs = (player_performace_dict['avg_fga'], player_performace_dict['avg_fta'],
+                    player_performace_dict['avg_tov'], team_fga, team_fta, team_tov)
+    team_possessions = (team_fga + 0.475*team_fta + team_tov) if None not in usage_inputs else 0
+    if average_mins and team_possessions:
+        usage_rate = (
+            (player_performace_dict['avg_fga'] + 0.475*player_performace_dict['avg_fta'] + player_performace_dict['avg_tov']) * 240
+            / (average_mins * team_possessions)
+        )
+        importance_score = round(alpha * (average_mins / 48) + (1 - alpha) * usage_rate, 2)
+    else:
+        usage_rate = None
+        importance_score = round(alpha * ((average_mins or 0) / 48), 2)
 
-    importance_score = round(alpha * (average_mins / 48) + (1 - alpha) * usage_rate, 2)
     if importance_score >= 0.6:
         importance_role = "Starter"
     elif importance_score >= 0.3:
@@ -785,18 +516,22 @@ def analyze_player(first_name, last_name, threshold=None):
         importance_role = "Bench"
 
     # If player has no playoff data
-    if playoff_games == []:
+    if not playoff_games or playoff_summary is None:
         num_playoff_games = None
         playoff_games = []
         playoff_avg = None
         playoff_minutes_avg = None
-        playoff_underCount = None
         playoff_points_home_avg = None
-        playoff_home_games = None
         playoff_points_away_avg = None
+        playoff_minutes_home_avg = None
         playoff_minutes_away_avg = None
-        playoff_minutes_away_avg = None
-        playoff_away_games = None
+    else:
+        playoff_avg = playoff_summary["all_points_avg"]
+        playoff_minutes_avg = playoff_summary["all_minutes_avg"]
+        playoff_points_home_avg = playoff_summary["home_points_avg"]
+        playoff_points_away_avg = playoff_summary["away_points_avg"]
+        playoff_minutes_home_avg = playoff_summary["home_minutes_avg"]
+        playoff_minutes_away_avg = playoff_summary["away_minutes_avg"]
 
     
 
@@ -829,12 +564,11 @@ def analyze_player(first_name, last_name, threshold=None):
         "opponentLogo": opponent_team_logo,
         
 
-        "threshold": threshold,
         "last5RegularGames": last_5_regular_games,
         "num_season_games" : num_season_count,
         "seasonAvgPoints": season_avg_points,
-        "points_home_avg": playoff_points_home_avg,
-        "points_away_avg": playoff_points_away_avg,
+        "points_home_avg": points_home_avg,
+        "points_away_avg": points_away_avg,
         "average_mins": average_mins,
         "importanceScore": importance_score,
         "importanceRole": importance_role,
@@ -843,8 +577,7 @@ def analyze_player(first_name, last_name, threshold=None):
         "seasonAvgVsOpponent": season_avg_points_vs_opponent,
         "careerAvgVsOpponent": career_avg_points_vs_opponent,
         "last5RegularGamesAvg": last_5_regular_games_avg,
-        "season_games_agst_opp" : fetch_all_opponent_games(nba_player_id, opponent_abbr),
-        "underCount" : underCount,
+        "season_games_agst_opp" : fetched["opp_games"],
 
         # Advanced metrics
         "avg_fga": player_performace_dict['avg_fga'],
@@ -872,7 +605,9 @@ def analyze_player(first_name, last_name, threshold=None):
         "playoff_minutes_avg" : playoff_minutes_avg,
         "playoff_minutes_home_avg": playoff_minutes_home_avg,
         "playoff_minutes_away_avg": playoff_minutes_away_avg,
-        "playoff_underCount" : playoff_underCount
+
+        "_season_points": season_summary["sorted_points"],
+        "_playoff_points": playoff_summary["sorted_points"] if playoff_games else None,
     }    
 
 
@@ -0,0 +1,155 @@
+"""
+player_profile.py
+─────────────────
+Threshold-independent half of a prop analysis, cached per player per
+game date.
+
+Everything expensive – the analyzer's upstream fetches, injury report,
+GARCH fits, ESPN odds, the Monte Carlo (μ, σ) – is the same for 24.5 and
+25.5, so it lives in a `PlayerProfile` built once. `apply_threshold()`
+then derives the line-dependent fields (under-counts, Poisson, Monte
+Carlo) in milliseconds – the normal model's tail is evaluated exactly.
+
+A profile is rebuilt once its game date is behind us (Eastern) or it is
+older than `PROFILE_TTL_SECONDS`, so injury status and odds stay current.
+"""
+
+import datetime
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pytz
+
+import distribution_store
+import player_analyzer
+from monte_carlo import prob_over
+from prediction_analyzer import calculate_poisson_probability
+
+_EASTERN = pytz.timezone("America/New_York")
+PROFILE_TTL_SECONDS = int(os.getenv("PROFILE_TTL_SECONDS", "1800"))
+
+_profiles = {}              # player_key -> (built_at, PlayerProfile)
+_lock = threading.Lock()
+_key_locks = {}
+
+
+@dataclass
+class PlayerProfile:
+    doc: dict                           # player document minus the line-dependent fields
+    season_points: np.ndarray           # sorted regular-season points
+    playoff_points: Optional[np.ndarray] = None
+
+    def mc_curve(self, thresholds):
+        """
+        P(points > t) at every threshold under the profile's (mcMu, mcSigma)
+        normal model – exact, nothing simulated. None without a model.
+        """
+        mu, sigma = self.doc.get("mcMu"), self.doc.get("mcSigma")
+        if mu is None:
+            return None
+        return prob_over({"distribution": "normal", "mu": mu, "sigma": sigma}, thresholds)
+
+    @property
+    def game_date(self):
+        raw = self.doc.get("gameDate")
+        try:
+            return datetime.datetime.strptime(raw, "%m/%d/%Y").date() if raw else None
+        except ValueError:
+            return None
+
+
+def _is_fresh(built_at, profile):
+    if time.time() - built_at > PROFILE_TTL_SECONDS:
+        return False
+    game_date = profile.game_date
+    return game_date is None or game_date >= datetime.datetime.now(_EASTERN).date()
+
+
+def get_profile(player_key, build):
+    """
+    Cached PlayerProfile for `player_key`, built with `build()` on a miss.
+    `build` returns a player_analyzer.profile_player()-style dict; an
+    {"error": ...} result is handed back as-is and not cached.
+    """
+    with _lock:
+        hit = _profiles.get(player_key)
+        key_lock = _key_locks.setdefault(player_key, threading.Lock())
+    if hit and _is_fresh(*hit):
+        return hit[1]
+
+    with key_lock:
+        with _lock:
+            hit = _profiles.get(player_key)
+        if hit and _is_fresh(*hit):
+            return hit[1]
+
+        raw = build()
+        if "error" in raw:
+            return raw
+        doc = {k: v for k, v in raw.items() if not k.startswith("_")}
+        profile = PlayerProfile(
+            doc=doc,
+            season_points=raw.get("_season_points", np.zeros(0)),
+            playoff_points=raw.get("_playoff_points"),
+        )
+        with _lock:
+            _profiles[player_key] = (time.time(), profile)
+        return profile
+
+
+def invalidate(player_key=None):
+    """Drop one player's profile, or all of them."""
+    with _lock:
+        if player_key is None:
+            _profiles.clear()
+        else:
+            _profiles.pop(player_key, None)
+
+
+def _stored_distribution(player_id, season_type):
+    """distribution_store entry, or None if it can't answer."""
+    if player_id is None:
+        return None
+    try:
+        dist = distribution_store.get(player_id, season_type=season_type)
+    except Exception as e:
+        print(f"[player_profile] distribution store unavailable for {player_id}: {e}")
+        return None
+    return dist if dist.count else None
+
+
+def apply_threshold(profile, threshold):
+    """Player document for one line: profile + under-counts, Poisson and Monte Carlo."""
+    pdata = player_analyzer.with_threshold(
+        {**profile.doc, "_season_points": profile.season_points,
+         "_playoff_points": profile.playoff_points},
+        threshold,
+    )
+    # prefer the store: it includes games settled since the build
+    player_id = profile.doc.get("playerId")
+    season = _stored_distribution(player_id, "Regular Season")
+    if season is not None:
+        if threshold is not None:
+            pdata["underCount"] = season.under_count(threshold)
+        low, high = season.band(0.8)
+        pdata["seasonPointsBand"] = {"p10": low, "median": season.percentile(0.5), "p90": high}
+    if profile.playoff_points is not None and threshold is not None:
+        playoffs = _stored_distribution(player_id, "Playoffs")
+        if playoffs is not None:
+            pdata["playoff_underCount"] = playoffs.under_count(threshold)
+
+    season_avg = pdata.get("seasonAvgPoints")
+    pdata["poissonProbability"] = (
+        calculate_poisson_probability(season_avg, threshold)
+        if season_avg is not None
+        else None
+    )
+    curve = profile.mc_curve([threshold])
+    pdata["monteCarloProbability"] = (
+        float(curve["prob_over"][0]) if curve is not None else None
+    ) or -1
+    return pdata
@@ -1,11 +1,9 @@
-import math
 import json
 import os
 from openai import OpenAI
 
-from math import factorial, exp
-# If you have scipy, you could do "from scipy.stats import poisson"
-# but here we implement Poisson manually.
+import distributions
+from distributions import poisson_over
 
 #############################
 # Existing Helper Functions (unchanged)
@@ -13,17 +11,11 @@ from math import factorial, exp
 
 def calculate_poisson_probability(avg_points, threshold):
     """
-    Calculate the probability of scoring at least 'threshold' points,
-    assuming the player's scoring follows a Poisson distribution with mean 'avg_points'.
+    Probability of scoring more than 'threshold' points (the prop's
+    "over", see distributions.py), assuming the player's scoring follows
+    a Poisson distribution with mean 'avg_points'.
     """
-    threshold_int = math.ceil(threshold)
-    
-    cumulative = sum(
-        (avg_points**i * math.exp(-avg_points)) / math.factorial(i)
-        for i in range(threshold_int)
-    )
-    probability = 1 - cumulative
-    return probability
+    return poisson_over(avg_points, threshold)
 
 
 
@@ -155,7 +147,7 @@ def compute_expected_points(player_id, opponent_id, game_date):
     return expected_points
 
 def poisson_pmf(k, lam):
-    return (math.exp(-lam) * (lam ** k)) / math.factorial(k)
+    return distributions.poisson_pmf(k, lam)
 
 def predict_player_points_poisson(player_id, opponent_id, game_date, threshold):
     lam = compute_expected_points(player_id, opponent_id, game_date)
@@ -169,15 +161,13 @@ def predict_player_points_poisson(player_id, opponent_id, game_date, threshold):
             "p_over_threshold": 0.0
         }
 
-    threshold_int = math.ceil(threshold)
-    p_le_threshold = sum(poisson_pmf(k, lam) for k in range(threshold_int + 1))
-    p_over_threshold = 1.0 - p_le_threshold
+    p_over_threshold = poisson_over(lam, threshold)
 
     return {
         "player_id": player_id,
         "opponent_id": opponent_id,
         "game_date": game_date,
         "lambda_est": lam,
-        "threshold": threshold_int,
+        "threshold": threshold,
         "p_over_threshold": p_over_threshold
     }
@@ -0,0 +1,111 @@
+"""
+schedule_index.py
+─────────────────
+League-wide schedule index shared by every request in the process.
+
+Each Eastern date's `ScoreboardV2` game header is fetched once and indexed
+as {team_id: game}. Looking up a team's next game walks those per-date
+dicts, so after the first request of the day it is a handful of dict
+lookups instead of up to 14 scoreboard calls per player.
+
+Refresh is incremental: dates already behind us are dropped, and a date
+is only refetched once its copy is older than `SCHEDULE_TTL_SECONDS`
+(game times, postponements and newly scheduled playoff games).
+"""
+
+import datetime
+import os
+import threading
+import time
+
+import pytz
+from nba_api.stats.endpoints import ScoreboardV2
+
+from fetch_planner import NBA_STATS, host_slot
+
+_EASTERN = pytz.timezone("America/New_York")
+SCHEDULE_TTL_SECONDS = int(os.getenv("SCHEDULE_TTL_SECONDS", str(6 * 3600)))
+MAX_SEARCH_DAYS = 14
+
+_dates = {}                 # date -> {"fetched_at", "frame", "teams"}
+_lock = threading.Lock()
+_date_locks = {}
+
+
+def _today():
+    return datetime.datetime.now(_EASTERN).date()
+
+
+def _index_frame(df):
+    """{team_id: game} for one scoreboard game header."""
+    by_team = {}
+    for game_id, home_id, away_id, status in zip(
+        df["GAME_ID"], df["HOME_TEAM_ID"], df["VISITOR_TEAM_ID"], df["GAME_STATUS_TEXT"]
+    ):
+        home_id, away_id = int(home_id), int(away_id)
+        by_team[home_id] = {"game_id": game_id, "game_time": status,
+                            "home": True, "opponent_team_id": away_id}
+        by_team[away_id] = {"game_id": game_id, "game_time": status,
+                            "home": False, "opponent_team_id": home_id}
+    return by_team
+
+
+def _prune():
+    today = _today()
+    with _lock:
+        for d in [d for d in _dates if d < today]:
+            del _dates[d]
+        for d in [d for d in _date_locks if d < today]:
+            del _date_locks[d]
+
+
+def scoreboard_for(date, max_age=SCHEDULE_TTL_SECONDS):
+    """
+    Cached entry {"fetched_at", "frame", "teams"} for `date`, refetched if
+    older than `max_age` seconds (pass 0 to force a fresh copy).
+    Returns None if the scoreboard could not be fetched.
+    """
+    with _lock:
+        entry = _dates.get(date)
+        lock = _date_locks.setdefault(date, threading.Lock())
+    if entry and time.time() - entry["fetched_at"] <= max_age:
+        return entry
+
+    with lock:
+        with _lock:
+            entry = _dates.get(date)
+        if entry and time.time() - entry["fetched_at"] <= max_age:
+            return entry
+        try:
+            with host_slot(NBA_STATS):
+                sb = ScoreboardV2(game_date=date.strftime("%m/%d/%Y"), league_id="00", timeout=30)
+            df = sb.game_header.get_data_frame()
+        except Exception as e:
+            print(f"[schedule_index] scoreboard fetch failed for {date}: {e}")
+            return entry        # a stale copy beats nothing
+        entry = {
+            "fetched_at": time.time(),
+            "frame": df,
+            "teams": _index_frame(df) if df is not None and not df.empty else {},
+        }
+        with _lock:
+            _dates[date] = entry
+        return entry
+
+
+def next_game(team_id, max_search_days=MAX_SEARCH_DAYS):
+    """
+    The first game for `team_id` from today (Eastern) onward:
+    {"game_id", "game_date" (MM/DD/YYYY), "game_time", "home",
+    "opponent_team_id"} – or None if nothing within `max_search_days`.
+    """
+    _prune()
+    team_id = int(team_id)
+    day = _today()
+    for _ in range(max_search_days):
+        entry = scoreboard_for(day)
+        game = entry["teams"].get(team_id) if entry else None
+        if game:
+            return {**game, "game_date": day.strftime("%m/%d/%Y")}
+        day += datetime.timedelta(days=1)
+    return None
@@ -0,0 +1,95 @@
+"""
+season_aggregates.py
+────────────────────
+Every split analyze_player reports, from one annotated game-log frame
+(see game_log_frames.annotate) in a single vectorized pass.
+
+All masked sums come out of one matrix product: a (games × splits) 0/1
+mask – all games, home, away, most recent N – against a
+(games × stats) value matrix. Points are also kept sorted so the number
+of games at or under any line is a binary search, and a whole list of
+lines costs one `np.searchsorted`.
+"""
+
+import numpy as np
+
+# stat name -> game-log column
+STAT_COLUMNS = {
+    "points":  "PTS",
+    "minutes": "MINUTES",
+    "fga":     "FGA",
+    "fgm":     "FGM",
+    "pa3":     "FG3A",
+    "pm3":     "FG3M",
+    "fta":     "FTA",
+    "ftm":     "FTM",
+    "tov":     "TOV",
+}
+SPLITS = ("all", "home", "away", "recent")
+
+
+def _div(num, den):
+    return float(num / den) if den else None
+
+
+def under_counts(sorted_points, thresholds):
+    """Games with points <= each threshold (array in, array out)."""
+    return np.searchsorted(sorted_points, np.asarray(thresholds, dtype=float), side="right")
+
+
+def under_count(sorted_points, threshold):
+    return int(under_counts(sorted_points, [threshold])[0])
+
+
+def summarize(games, recent=5, thresholds=()):
+    """
+    Aggregate an annotated game-log frame (most recent game first).
+
+    Returns a dict with
+      games / home_games / away_games / recent_games,
+      {split}_{stat}_total and {split}_{stat}_avg for every split × stat,
+      efg, shot_dist_3pt, ft_rate, ts_pct (season rates),
+      sorted_points (np.ndarray) and under_counts {threshold: count}.
+    Averages are None when a split has no games.
+    """
+    n = len(games)
+    values = np.column_stack([
+        games[col].to_numpy(dtype=float) if col in games else np.zeros(n)
+        for col in STAT_COLUMNS.values()
+    ]) if n else np.zeros((0, len(STAT_COLUMNS)))
+
+    loc = games["LOCATION"].to_numpy() if n else np.array([])
+    masks = np.column_stack([
+        np.ones(n),
+        loc == "Home",
+        loc == "Away",
+        np.arange(n) < recent,
+    ]).astype(float) if n else np.zeros((0, len(SPLITS)))
+
+    sums = masks.T @ values                   # (splits × stats)
+    counts = masks.sum(axis=0)                # games per split
+
+    out = {
+        "games": n,
+        "home_games": int(counts[1]),
+        "away_games": int(counts[2]),
+        "recent_games": int(counts[3]),
+    }
+    for i, split in enumerate(SPLITS):
+        for j, stat in enumerate(STAT_COLUMNS):
+            out[f"{split}_{stat}_total"] = float(sums[i, j])
+            out[f"{split}_{stat}_avg"] = _div(sums[i, j], counts[i])
+
+    t = dict(zip(STAT_COLUMNS, sums[0]))
+    out["efg"] = _div(t["fgm"] + 0.5 * t["pm3"], t["fga"])
+    out["shot_dist_3pt"] = _div(t["pa3"], t["fga"])
+    out["ft_rate"] = _div(t["fta"], t["fga"])
+    out["ts_pct"] = _div(t["points"], 2 * (t["fga"] + 0.44 * t["fta"]))
+
+    sorted_points = np.sort(values[:, 0]) if n else np.zeros(0)
+    out["sorted_points"] = sorted_points
+    out["under_counts"] = dict(zip(
+        (float(x) for x in thresholds),
+        (int(c) for c in under_counts(sorted_points, list(thresholds))),
+    )) if len(thresholds) else {}
+    return out
@@ -0,0 +1,104 @@
+"""
+single_flight.py
+────────────────
+Request coalescing: concurrent calls with the same key share one
+computation.
+
+    result = single_flight.do(key, compute, recheck=lookup)
+
+• In-process – the first caller for `key` runs `compute()`; callers that
+  arrive while it runs block on its result (or its exception).
+• Across workers (optional) – with `SINGLE_FLIGHT_LOCK_DIR` set, the
+  leader also takes an exclusive `flock` on a per-key lock file there.
+  A worker that had to wait for the lock calls `recheck()` first and
+  returns its result if the other worker already stored one.
+  Waiting gives up after `SINGLE_FLIGHT_WAIT_SECONDS` and computes anyway.
+"""
+
+import fcntl
+import hashlib
+import os
+import threading
+import time
+
+SINGLE_FLIGHT_LOCK_DIR = os.getenv("SINGLE_FLIGHT_LOCK_DIR")
+SINGLE_FLIGHT_WAIT_SECONDS = float(os.getenv("SINGLE_FLIGHT_WAIT_SECONDS", "120"))
+_POLL_SECONDS = 0.1
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_inflight = {}              # key -> _Call
+_lock = threading.Lock()
+
+
+def do(key, compute, recheck=None):
+    """Run `compute()` once for all concurrent callers with `key`."""
+    with _lock:
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _inflight[key] = _Call()
+
+    if not leader:
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    try:
+        call.result = _run_locked(key, compute, recheck)
+    except BaseException as e:
+        call.error = e
+        raise
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+        call.done.set()
+    return call.result
+
+
+def _lock_path(key):
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()
+    return os.path.join(SINGLE_FLIGHT_LOCK_DIR, f"{digest}.lock")
+
+
+def _run_locked(key, compute, recheck):
+    if not SINGLE_FLIGHT_LOCK_DIR:
+        return compute()
+
+    try:
+        os.makedirs(SINGLE_FLIGHT_LOCK_DIR, exist_ok=True)
+        f = open(_lock_path(key), "a+")
+    except OSError as e:
+        print(f"[single_flight] lock file unavailable, computing unlocked: {e}")
+        return compute()
+
+    with f:
+        locked, waited = False, False
+        deadline = time.monotonic() + SINGLE_FLIGHT_WAIT_SECONDS
+        while True:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                locked = True
+                break
+            except BlockingIOError:
+                waited = True
+                if time.monotonic() >= deadline:
+                    print(f"[single_flight] gave up waiting on {key!r}, computing anyway")
+                    break
+                time.sleep(_POLL_SECONDS)
+        try:
+            if waited and recheck is not None:
+                found = recheck()
+                if found is not None:
+                    return found
+            return compute()
+        finally:
+            if locked:
+                fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,126 @@
+"""
+standings_snapshot.py
+─────────────────────
+Process-wide `LeagueStandings` snapshot: {team_id: {"PlayoffRank", "Conference"}}.
+
+• Lookups are a dict get.
+• Once the snapshot is older than `STANDINGS_TTL_SECONDS` it is refreshed
+  on a background thread while callers keep reading the old copy.
+• Every refresh is written to `STANDINGS_CACHE_PATH` (a local JSON file),
+  so gunicorn workers on the same host pick up each other's fetches and a
+  freshly started worker does not start cold.
+• Only a process with no snapshot at all (no memory, no file) blocks on
+  the first fetch – `warm_in_background()` at startup avoids even that.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from nba_api.stats.endpoints import leaguestandings
+
+from fetch_planner import NBA_STATS, host_slot
+
+STANDINGS_TTL_SECONDS = int(os.getenv("STANDINGS_TTL_SECONDS", str(3 * 3600)))
+STANDINGS_CACHE_PATH = os.getenv(
+    "STANDINGS_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "lambdarim_standings.json"),
+)
+
+_snapshot = None            # {"fetched_at": float, "by_team": {team_id: {...}}}
+_lock = threading.Lock()
+_refresh_lock = threading.Lock()     # held while a background refresh runs
+
+
+def _is_stale(snap):
+    return time.time() - snap["fetched_at"] > STANDINGS_TTL_SECONDS
+
+
+def _read_file():
+    try:
+        with open(STANDINGS_CACHE_PATH) as f:
+            raw = json.load(f)
+        return {
+            "fetched_at": raw["fetched_at"],
+            "by_team": {int(k): v for k, v in raw["by_team"].items()},
+        }
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write_file(snap):
+    directory = os.path.dirname(STANDINGS_CACHE_PATH) or "."
+    try:
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(snap, f)
+        os.replace(tmp, STANDINGS_CACHE_PATH)   # atomic for readers in other workers
+    except OSError as e:
+        print(f"[standings_snapshot] could not write {STANDINGS_CACHE_PATH}: {e}")
+
+
+def _fetch():
+    with host_slot(NBA_STATS):
+        df = leaguestandings.LeagueStandings().get_data_frames()[0]
+    by_team = {
+        int(team_id): {"PlayoffRank": int(rank), "Conference": conf}
+        for team_id, rank, conf in zip(df["TeamID"], df["PlayoffRank"], df["Conference"])
+    }
+    return {"fetched_at": time.time(), "by_team": by_team}
+
+
+def refresh():
+    """Fetch now unless another worker already refreshed the shared file."""
+    global _snapshot
+    snap = _read_file()
+    if snap is None or _is_stale(snap):
+        snap = _fetch()
+        _write_file(snap)
+    with _lock:
+        _snapshot = snap
+    return snap
+
+
+def _refresh_in_background():
+    if not _refresh_lock.acquire(blocking=False):
+        return
+
+    def run():
+        try:
+            refresh()
+        except Exception as e:
+            print(f"[standings_snapshot] background refresh failed: {e}")
+        finally:
+            _refresh_lock.release()
+
+    threading.Thread(target=run, name="standings-refresh", daemon=True).start()
+
+
+def warm_in_background():
+    """Kick off a refresh at startup so the first request finds a snapshot."""
+    _refresh_in_background()
+
+
+def snapshot():
+    """Current {team_id: {"PlayoffRank", "Conference"}} mapping."""
+    global _snapshot
+    with _lock:
+        snap = _snapshot
+    if snap is None:
+        snap = _read_file()
+        if snap is None:
+            snap = refresh()            # truly cold: nothing to serve yet
+        with _lock:
+            _snapshot = snap
+    if _is_stale(snap):
+        _refresh_in_background()
+    return snap["by_team"]
+
+
+def get_team_standing(team_id):
+    """{"PlayoffRank", "Conference"} for `team_id`, or None."""
+    if team_id is None:
+        return None
+    return snapshot().get(int(team_id))
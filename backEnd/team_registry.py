@@ -0,0 +1,67 @@
+"""
+team_registry.py
+────────────────
+Immutable NBA team lookup tables, built once at import from nba_api's
+static team list. Every index is a hash lookup:
+
+    BY_ABBR["LAL"], BY_ID[1610612747], BY_FULL_NAME["Los Angeles Lakers"],
+    BY_FIRESTORE_KEY["los_angeles_lakers"]
+
+`lookup()` resolves whatever string a source hands us – abbreviation,
+full name, nickname, Firestore key or the "LA Clippers" style names used
+by balldontlie / ESPN / the injury-report PDF.
+"""
+
+from types import MappingProxyType
+
+from nba_api.stats.static import teams
+
+
+def firestore_key(name):
+    """Team name -> Firestore document id (e.g. "los_angeles_lakers")."""
+    return name.lower().replace(" ", "_").replace(".", "")
+
+
+TEAMS = tuple(MappingProxyType(dict(t)) for t in teams.get_teams())
+
+BY_ABBR = MappingProxyType({t["abbreviation"]: t for t in TEAMS})
+BY_ID = MappingProxyType({t["id"]: t for t in TEAMS})
+BY_FULL_NAME = MappingProxyType({t["full_name"]: t for t in TEAMS})
+BY_FIRESTORE_KEY = MappingProxyType({firestore_key(t["full_name"]): t for t in TEAMS})
+BY_NICKNAME = MappingProxyType({firestore_key(t["nickname"]): t for t in TEAMS})
+
+
+def lookup(name):
+    """Team dict for any common spelling of a team, or None."""
+    if not name:
+        return None
+    name = str(name).strip()
+    team = BY_FULL_NAME.get(name) or BY_ABBR.get(name.upper())
+    if team:
+        return team
+    key = firestore_key(name)
+    team = BY_FIRESTORE_KEY.get(key) or BY_NICKNAME.get(key)
+    if team:
+        return team
+    # "LA Clippers", "Golden State" ... – fall back to the trailing nickname
+    for i in range(1, len(key.split("_"))):
+        team = BY_NICKNAME.get("_".join(key.split("_")[i:]))
+        if team:
+            return team
+    return None
+
+
+def full_name_from_abbr(abbr):
+    team = BY_ABBR.get(abbr)
+    return team["full_name"] if team else abbr
+
+
+def id_from_abbr(abbr):
+    team = BY_ABBR.get(abbr)
+    return team["id"] if team else None
+
+
+def same_team(a, b):
+    """True if two team names from different sources refer to one team."""
+    ta, tb = lookup(a), lookup(b)
+    return ta is not None and ta is tb
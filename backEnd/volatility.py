@@ -1,8 +1,30 @@
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 from arch import arch_model
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from player_analyzer import fetch_more_games
 
+# Fitted GARCH per series key: {"fingerprint", "params", "sigma"}.
+# The same points give the same forecast, so it is reused as-is; when the
+# series changes (a new game) the refit starts from the previous params.
+_fits = {}
+_fits_lock = threading.Lock()
+
+VOLATILITY_WORKERS = int(os.getenv("VOLATILITY_WORKERS", str(os.cpu_count() or 1)))
+
+# Estimator per caller: interactive requests need an answer in well under
+# a millisecond, the nightly/pre-tip-off batch can afford the GARCH fit.
+VOLATILITY_ESTIMATOR_INTERACTIVE = os.getenv("VOLATILITY_ESTIMATOR_INTERACTIVE", "ewma")
+VOLATILITY_ESTIMATOR_BATCH = os.getenv("VOLATILITY_ESTIMATOR_BATCH", "garch")
+EWMA_LAMBDA = float(os.getenv("EWMA_LAMBDA", "0.94"))     # RiskMetrics daily decay
+ROLLING_WINDOW = int(os.getenv("ROLLING_WINDOW", "10"))
+
 
 def fetch_point_series(player_data, n_games=50):
     """
@@ -21,27 +43,200 @@ def fetch_point_series(player_data, n_games=50):
     return series
 
 
-def forecast_volatility(point_series):
+def _fingerprint(returns):
+    return hashlib.sha1(np.ascontiguousarray(returns.to_numpy(dtype=float)).tobytes()).hexdigest()
+
+
+def _fit_garch(returns, starting_values=None):
+    # p=1, q=1
+    model = arch_model(returns, vol="Garch", p=1, q=1)
+    if starting_values is not None:
+        try:
+            return model.fit(disp="off", starting_values=starting_values)
+        except Exception as e:
+            print(f"[volatility] warm start failed, refitting cold: {e}")
+    return model.fit(disp="off")
+
+
+def _fit_returns(returns, starting_values=None):
+    """(params, 1-step σ) for one return series – runs in pool workers too."""
+    res = _fit_garch(returns, starting_values)
+    # variance forecast horizon=1
+    var_forecast = res.forecast(horizon=1).variance.iloc[-1, 0]
+    return res.params.to_numpy(), float(var_forecast ** 0.5)
+
+
+def _remember_fit(cache_key, fingerprint, params, sigma):
+    with _fits_lock:
+        _fits[cache_key] = {"fingerprint": fingerprint, "params": params, "sigma": sigma}
+
+
+def _cached_fit(cache_key, returns):
+    """(fingerprint, cached entry or None); entry["sigma"] is current if fingerprints match."""
+    fingerprint = _fingerprint(returns)
+    with _fits_lock:
+        return fingerprint, _fits.get(cache_key)
+
+
+def forecast_volatility(point_series, cache_key=None, estimator="garch"):
     """
-    Fit a GARCH(1,1) to the day-to-day returns of points
-    and return the 1-step ahead forecasted σ (std. dev).
+    1-step ahead forecasted σ (std. dev) of the day-to-day returns of
+    points, from `estimator` ("garch", "ewma" or "rolling" – see
+    ESTIMATORS). GARCH(1,1) needs 10 returns, the others 2; shorter
+    series give 0.0.
+
+    With a `cache_key` (e.g. ("regular", player_id)) the GARCH fit is
+    cached: unchanged points reuse the cached forecast without fitting,
+    and new points refit warm-started from the previous parameters.
     """
+    if estimator != "garch":
+        return forecast_many({cache_key: point_series}, estimator=estimator)[cache_key]
+
     # day-to-day diff
     returns = point_series.diff().dropna()
     if len(returns) < 10:
         return 0.0
 
-    # p=1, q=1
-    model = arch_model(returns, vol="Garch", p=1, q=1)
-    res   = model.fit(disp="off")
-    # variance forecast horizon=1
-    var_forecast = res.forecast(horizon=1).variance.iloc[-1, 0]
-    return float(var_forecast ** 0.5)
+    if cache_key is None:
+        return _fit_returns(returns)[1]
+
+    fingerprint, cached = _cached_fit(cache_key, returns)
+    if cached and cached["fingerprint"] == fingerprint:
+        return cached["sigma"]
+    params, sigma = _fit_returns(returns, cached["params"] if cached else None)
+    _remember_fit(cache_key, fingerprint, params, sigma)
+    return sigma
 
 
-def forecast_playoff_volatility(player_data):
+def forecast_many(series_by_key, max_workers=VOLATILITY_WORKERS, estimator="garch"):
+    """forecast_volatility() for many keyed series at once: {key: σ}."""
+    if estimator not in ESTIMATORS:
+        raise ValueError(f"Unknown volatility estimator {estimator!r}")
+    if estimator == "garch":
+        returns = {key: series.diff().dropna() for key, series in series_by_key.items()}
+        return _garch_many(returns, max_workers)
+    returns = {}
+    for key, series in series_by_key.items():
+        diffs = np.diff(np.asarray(series, dtype=float))
+        returns[key] = diffs[~np.isnan(diffs)]
+    return ESTIMATORS[estimator](returns)
+
+
+def _garch_many(returns_by_key, max_workers):
+    """
+    Cached fits are answered in place; the remaining GARCH fits run in
+    parallel in a process pool (they are CPU-bound, so threads would
+    serialize on the GIL). Results land in this process's fit cache. A
+    fit that fails is logged and left out of the result.
+    """
+    out, todo = {}, {}
+    for key, returns in returns_by_key.items():
+        if len(returns) < 10:
+            out[key] = 0.0
+            continue
+        fingerprint, cached = _cached_fit(key, returns)
+        if cached and cached["fingerprint"] == fingerprint:
+            out[key] = cached["sigma"]
+            continue
+        todo[key] = (returns, fingerprint, cached["params"] if cached else None)
+
+    if not todo:
+        return out
+    # spawn: never fork a request-serving process that has live threads
+    with ProcessPoolExecutor(
+        max_workers=max(1, min(max_workers, len(todo))),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as pool:
+        futures = {
+            pool.submit(_fit_returns, returns, start): key
+            for key, (returns, _, start) in todo.items()
+        }
+        for fut in as_completed(futures):
+            key = futures[fut]
+            try:
+                params, sigma = fut.result()
+            except Exception as e:
+                print(f"[volatility] fit failed for {key}: {e}")
+                continue
+            _remember_fit(key, todo[key][1], params, sigma)
+            out[key] = sigma
+    return out
+
+
+############################################################################
+### Closed-form estimators, vectorized over every series at once
+############################################################################
+
+def _stack(returns_by_key):
+    """(keys, rows × time matrix) with each series right-aligned, NaN-padded."""
+    keys = list(returns_by_key)
+    width = max((len(r) for r in returns_by_key.values()), default=0)
+    matrix = np.full((len(keys), width), np.nan)
+    for i, key in enumerate(keys):
+        values = np.asarray(returns_by_key[key], dtype=float)
+        if len(values):
+            matrix[i, width - len(values):] = values
+    return keys, matrix
+
+
+def _by_key(keys, sigma, counts):
+    return {key: float(s) if n >= 2 else 0.0 for key, s, n in zip(keys, sigma, counts)}
+
+
+def ewma_many(returns_by_key, lam=None):
+    """
+    RiskMetrics EWMA: σ²ₜ₊₁ = λσ²ₜ + (1-λ)rₜ², seeded with the mean
+    squared return. One pass over time, vectorized across series.
+    """
+    lam = EWMA_LAMBDA if lam is None else lam
+    keys, r = _stack(returns_by_key)
+    valid = ~np.isnan(r)
+    counts = valid.sum(axis=1)
+    squared = np.where(valid, r, 0.0) ** 2
+    var = squared.sum(axis=1) / np.maximum(counts, 1)
+    for j in range(r.shape[1]):
+        var = np.where(valid[:, j], lam * var + (1 - lam) * squared[:, j], var)
+    return _by_key(keys, np.sqrt(var), counts)
+
+
+def rolling_many(returns_by_key, window=None):
+    """Sample std. dev of each series' last `window` returns."""
+    window = ROLLING_WINDOW if window is None else window
+    keys, r = _stack(returns_by_key)
+    tail = r[:, -window:]
+    counts = (~np.isnan(tail)).sum(axis=1)
+    total = np.nansum(tail, axis=1)
+    mean = total / np.maximum(counts, 1)
+    ss = np.nansum((tail - mean[:, None]) ** 2, axis=1)
+    sigma = np.sqrt(ss / np.maximum(counts - 1, 1))
+    return _by_key(keys, sigma, counts)
+
+
+ESTIMATORS = {
+    "garch": _garch_many,
+    "ewma": ewma_many,
+    "rolling": rolling_many,
+}
+
+
+def invalidate(cache_key=None):
+    """Drop one cached fit, or all of them."""
+    with _fits_lock:
+        if cache_key is None:
+            _fits.clear()
+        else:
+            _fits.pop(cache_key, None)
+
+
+def playoff_point_series(player_data):
     po = player_data.get("playoff_games", [])[:]
     dates = [pd.to_datetime(g["date"]) for g in po]
     pts   = [g["points"] for g in po]
-    series = pd.Series(data=pts, index=dates).sort_index()
-    return forecast_volatility(series)
+    return pd.Series(data=pts, index=dates).sort_index()
+
+
+def forecast_playoff_volatility(player_data, estimator="garch"):
+    player_id = player_data.get("playerId")
+    return forecast_volatility(playoff_point_series(player_data),
+                               ("playoffs", player_id) if player_id else None,
+                               estimator)
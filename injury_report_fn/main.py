@@ -10,13 +10,14 @@ import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backEnd"))
 from injury_report import get_player_injury_status_new
 from chatgpt_bet_explainer import get_bet_explanation_from_chatgpt
+from team_registry import firestore_key
 
 # ------------- one‑time SDK bootstrap -------------
 firebase_admin.initialize_app()
 db = firestore.client()
 
 def _team_key(name: str) -> str:
-    return name.lower().replace(" ", "_")
+    return firestore_key(name)
 
 # ------------- the function -------------
 @functions_framework.cloud_event          # Pub/Sub trigger